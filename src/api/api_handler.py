@@ -5,15 +5,97 @@ Provides a clean interface for making API requests while handling errors,
 rate limiting, and response processing.
 """
 
+import asyncio
+import functools
+import hashlib
 import logging
 import time
-import openai
-from typing import Dict, Any, List, Optional
-from tenacity import retry, stop_after_attempt, wait_exponential
+import uuid
+from collections import OrderedDict, deque
+import orjson
+from typing import Dict, Any, AsyncIterator, List, Optional, Tuple, Union
+from tenacity import (
+    retry,
+    retry_if_exception,
+    stop_after_attempt,
+    wait_random_exponential
+)
+
+# The OpenAI SDK and httpx are imported on first use: together with their
+# dependencies they add noticeable startup time and memory on small devices.
 
 # Configure logging
 logger = logging.getLogger(__name__)
 
+BATCH_ENDPOINT = "/v1/chat/completions"
+
+def _is_retryable(error: BaseException) -> bool:
+    """
+    Check whether an API error is transient and worth retrying.
+    """
+    import openai
+    return isinstance(error, (openai.RateLimitError, openai.APIConnectionError))
+
+# Retry policy shared by every request that can safely be sent again
+_retry_transient = retry(
+    stop=stop_after_attempt(3),
+    wait=wait_random_exponential(multiplier=1, max=30),
+    retry=retry_if_exception(_is_retryable),
+    reraise=True
+)
+
+@functools.lru_cache(maxsize=8)
+def _system_message(content: str) -> Dict[str, str]:
+    """
+    Build (and memoize) the system message for a prompt string.
+    The returned dict is shared and must not be modified.
+    """
+    return {"role": "system", "content": content}
+
+class BatchQueue:
+    """
+    Collects chat completion requests to be submitted together through
+    the OpenAI Batch API (cheaper, but completed within 24 hours).
+    """
+
+    def __init__(self):
+        """Initialize an empty batch queue."""
+        self.requests: List[Dict[str, Any]] = []
+
+    def add(self, body: Dict[str, Any], custom_id: Optional[str] = None) -> str:
+        """
+        Add a chat completion request body to the queue.
+        
+        Args:
+            body (Dict[str, Any]): Request body for the chat completions endpoint
+            custom_id (Optional[str]): Identifier used to match the result later
+            
+        Returns:
+            str: The custom_id assigned to the request
+        """
+        custom_id = custom_id or uuid.uuid4().hex
+        self.requests.append({
+            "custom_id": custom_id,
+            "method": "POST",
+            "url": BATCH_ENDPOINT,
+            "body": body
+        })
+        logger.debug("Queued batch request %s", custom_id)
+        return custom_id
+
+    def drain(self) -> List[Dict[str, Any]]:
+        """
+        Remove and return all queued requests.
+        
+        Returns:
+            List[Dict[str, Any]]: Queued batch request lines
+        """
+        requests, self.requests = self.requests, []
+        return requests
+
+    def __len__(self) -> int:
+        return len(self.requests)
+
 class APIHandler:
     """
     Handles all external API interactions, particularly with OpenAI's GPT models.
@@ -33,20 +115,57 @@ class APIHandler:
         self.max_tokens = config.get("OPENAI_MAX_TOKENS", 150)
         self.temperature = config.get("OPENAI_TEMPERATURE", 0.7)
         
-        # Initialize OpenAI client
-        openai.api_key = self.api_key
+        # Initialize OpenAI clients on a pooled HTTP client so TCP/TLS
+        # connections are kept alive and reused across requests
+        import httpx
+        import openai
+        self._http = httpx.AsyncClient(
+            http2=True,
+            limits=httpx.Limits(
+                max_connections=config.get("HTTP_MAX_CONNECTIONS", 20),
+                max_keepalive_connections=config.get("HTTP_MAX_CONNECTIONS", 20),
+                keepalive_expiry=30.0
+            ),
+            timeout=config.get("API_TIMEOUT", 30)
+        )
+        
+        # One client per endpoint; requests go to the endpoint with the fewest
+        # requests in flight. Defaults to a single OpenAI endpoint.
+        endpoints = config.get("OPENAI_ENDPOINTS") or [{}]
+        self._clients = [
+            openai.AsyncOpenAI(
+                api_key=endpoint.get("api_key", self.api_key),
+                base_url=endpoint.get("base_url"),
+                http_client=self._http,
+                max_retries=0  # Retries are handled by tenacity below
+            )
+            for endpoint in endpoints
+        ]
+        self._inflight = [0] * len(self._clients)
+        self._client = self._clients[0]
         
         # Rate limiting settings
-        self.last_request_time = 0
+        self.last_request_time = 0.0
         self.min_request_interval = config.get("MIN_REQUEST_INTERVAL", 1.0)  # seconds
+        self._rate_limit_lock = asyncio.Lock()
+        
+        # Recent 429 responses; each one inside the window stretches the request interval
+        self._rate_limit_hits: deque = deque()
+        self.rate_limit_window = config.get("RATE_LIMIT_WINDOW", 60.0)  # seconds
+        
+        # Bound the number of requests in flight at once
+        self.max_concurrent_requests = config.get("MAX_CONCURRENT_REQUESTS", 5)
+        self._request_semaphore = asyncio.Semaphore(self.max_concurrent_requests)
         
-        logger.info(f"APIHandler initialized with model: {self.model}")
+        # Response cache settings (only used for low-temperature, deterministic requests)
+        self._cache: "OrderedDict[str, Tuple[float, str]]" = OrderedDict()
+        self.cache_size = config.get("RESPONSE_CACHE_SIZE", 1024)
+        self.cache_ttl = config.get("RESPONSE_CACHE_TTL", 3600)  # seconds
+        self.cache_max_temperature = config.get("RESPONSE_CACHE_MAX_TEMPERATURE", 0.3)
+        
+        logger.info("APIHandler initialized with model: %s", self.model)
 
-    @retry(
-        stop=stop_after_attempt(3),
-        wait=wait_exponential(multiplier=1, min=4, max=10),
-        reraise=True
-    )
+    @_retry_transient
     async def generate_response(
         self,
         messages: List[Dict[str, str]],
@@ -65,70 +184,344 @@ class APIHandler:
         Raises:
             Exception: If API request fails after retries
         """
+        import openai
+        
         try:
-            # Rate limiting
-            self._handle_rate_limit()
-            
-            # Prepare messages
-            formatted_messages = []
-            if system_prompt:
-                formatted_messages.append({
-                    "role": "system",
-                    "content": system_prompt
-                })
-            formatted_messages.extend(messages)
-            
-            logger.debug(f"Making API request with {len(formatted_messages)} messages")
-            
-            # Make API request
-            response = await openai.ChatCompletion.acreate(
-                model=self.model,
-                messages=formatted_messages,
-                temperature=self.temperature,
-                max_tokens=self.max_tokens
+            # Prepare messages (passed through unchanged without a system prompt)
+            formatted_messages = (
+                [_system_message(system_prompt), *messages] if system_prompt else messages
             )
             
+            # Serve identical deterministic requests from the cache
+            cache_key = None
+            if self._cache_enabled():
+                cache_key = self._cache_key(
+                    self.model, formatted_messages, self.temperature, self.max_tokens
+                )
+                cached = self._cache_get(cache_key)
+                if cached is not None:
+                    logger.debug("Serving response from cache")
+                    return cached
+            
+            async with self._request_semaphore:
+                # Rate limiting
+                await self._handle_rate_limit()
+                
+                logger.debug("Making API request with %s messages", len(formatted_messages))
+                
+                # Make API request
+                client_index = self._acquire_client()
+                try:
+                    response = await self._clients[client_index].chat.completions.create(
+                        model=self.model,
+                        messages=formatted_messages,
+                        temperature=self.temperature,
+                        max_tokens=self.max_tokens
+                    )
+                finally:
+                    self._inflight[client_index] -= 1
+            
             # Extract and log response
             response_text = response.choices[0].message.content.strip()
-            logger.info(f"Generated response of length {len(response_text)}")
+            logger.info("Generated response of length %s", len(response_text))
+            
+            if cache_key is not None:
+                self._cache_put(cache_key, response_text)
             
             return response_text
             
-        except openai.error.RateLimitError:
-            logger.warning("Rate limit exceeded, retrying after exponential backoff")
+        except openai.RateLimitError as e:
+            await self._handle_rate_limit_error(e)
             raise
             
-        except openai.error.APIError as e:
-            logger.error(f"OpenAI API error: {str(e)}")
+        except openai.APIError as e:
+            logger.error("OpenAI API error: %s", e)
             raise
             
         except Exception as e:
-            logger.error(f"Unexpected error in generate_response: {str(e)}")
+            logger.error("Unexpected error in generate_response: %s", e)
             raise
 
-    def _handle_rate_limit(self) -> None:
+    async def _handle_rate_limit_error(self, error: Exception) -> None:
         """
-        Implement basic rate limiting to prevent API abuse.
+        Record a 429 response and wait as long as the server asked before the
+        request is retried. Without a Retry-After header the retry policy's
+        exponential backoff applies.
+        
+        Args:
+            error (Exception): Rate limit error raised by the OpenAI client
+        """
+        self._rate_limit_hits.append(time.monotonic())
+        retry_after = self._get_retry_after(error)
+        if retry_after:
+            logger.warning("Rate limit exceeded, waiting %.2fs as requested by the server", retry_after)
+            await asyncio.sleep(retry_after)
+        else:
+            logger.warning("Rate limit exceeded, retrying after exponential backoff")
+
+    @staticmethod
+    def _get_retry_after(error: Exception) -> Optional[float]:
+        """
+        Read the Retry-After header (in seconds) from an API error response.
+        
+        Args:
+            error (Exception): Error raised by the OpenAI client
+            
+        Returns:
+            Optional[float]: Seconds to wait, or None if not provided
+        """
+        response = getattr(error, "response", None)
+        if response is None:
+            return None
+        try:
+            return float(response.headers.get("retry-after"))
+        except (TypeError, ValueError):
+            return None
+
+    def _recent_rate_limit_hits(self) -> int:
+        """
+        Count the 429 responses received within the rate limit window.
+        
+        Returns:
+            int: Number of recent rate limit errors
+        """
+        cutoff = time.monotonic() - self.rate_limit_window
+        while self._rate_limit_hits and self._rate_limit_hits[0] < cutoff:
+            self._rate_limit_hits.popleft()
+        return len(self._rate_limit_hits)
+
+    def _acquire_client(self) -> int:
+        """
+        Select the client with the fewest requests in flight and mark it busy.
+        The caller must decrement its in-flight count when the request ends.
+        
+        Returns:
+            int: Index of the selected client
+        """
+        index = min(range(len(self._clients)), key=self._inflight.__getitem__)
+        self._inflight[index] += 1
+        return index
+
+    def _cache_enabled(self) -> bool:
+        """
+        Check whether responses are deterministic enough to be cached.
+        
+        Returns:
+            bool: True if caching is enabled for the current settings
+        """
+        return self.cache_size > 0 and self.temperature <= self.cache_max_temperature
+
+    @staticmethod
+    def _cache_key(
+        model: str,
+        messages: List[Dict[str, str]],
+        temperature: float,
+        max_tokens: int
+    ) -> str:
+        """
+        Build a deterministic cache key for a chat completion request.
+        
+        Args:
+            model (str): Model name
+            messages (List[Dict[str, str]]): Fully formatted request messages
+            temperature (float): Sampling temperature
+            max_tokens (int): Maximum number of tokens to generate
+            
+        Returns:
+            str: SHA-256 hex digest of the canonical request JSON
+        """
+        payload = orjson.dumps(
+            [model, messages, temperature, max_tokens],
+            option=orjson.OPT_SORT_KEYS
+        )
+        return hashlib.sha256(payload).hexdigest()
+
+    def _cache_get(self, key: str) -> Optional[str]:
+        """
+        Look up a cached response, dropping it if it has expired.
+        
+        Args:
+            key (str): Cache key
+            
+        Returns:
+            Optional[str]: Cached response text, or None on miss
         """
-        current_time = time.time()
-        time_since_last_request = current_time - self.last_request_time
+        entry = self._cache.get(key)
+        if entry is None:
+            return None
         
-        if time_since_last_request < self.min_request_interval:
-            sleep_time = self.min_request_interval - time_since_last_request
-            logger.debug(f"Rate limiting: sleeping for {sleep_time:.2f} seconds")
-            time.sleep(sleep_time)
+        stored_at, response_text = entry
+        if self.cache_ttl and time.monotonic() - stored_at > self.cache_ttl:
+            del self._cache[key]
+            return None
+        
+        self._cache.move_to_end(key)
+        return response_text
+
+    def _cache_put(self, key: str, response_text: str) -> None:
+        """
+        Store a response in the cache, evicting the least recently used entries.
         
-        self.last_request_time = time.time()
+        Args:
+            key (str): Cache key
+            response_text (str): Response text to store
+        """
+        self._cache[key] = (time.monotonic(), response_text)
+        self._cache.move_to_end(key)
+        while len(self._cache) > self.cache_size:
+            self._cache.popitem(last=False)
+
+    def clear_cache(self) -> None:
+        """Clear all cached responses."""
+        self._cache.clear()
+        logger.debug("Response cache cleared")
 
-    async def analyze_sentiment(self, text: str) -> Dict[str, float]:
+    async def stream_response(
+        self,
+        messages: List[Dict[str, str]],
+        system_prompt: Optional[str] = None
+    ) -> AsyncIterator[str]:
+        """
+        Stream a response from the configured GPT model as it is generated.
+        Opening the stream is retried like generate_response; errors after
+        the first chunk are not, since part of the response may already
+        have been consumed.
+        
+        Args:
+            messages (List[Dict[str, str]]): List of message dictionaries
+            system_prompt (Optional[str]): Optional system prompt to prepend
+            
+        Yields:
+            str: Chunks of response text
+        """
+        formatted_messages = (
+            [_system_message(system_prompt), *messages] if system_prompt else messages
+        )
+        
+        cache_key = None
+        if self._cache_enabled():
+            cache_key = self._cache_key(
+                self.model, formatted_messages, self.temperature, self.max_tokens
+            )
+            cached = self._cache_get(cache_key)
+            if cached is not None:
+                logger.debug("Serving response from cache")
+                yield cached
+                return
+        
+        chunks = []
+        try:
+            async with self._request_semaphore:
+                logger.debug("Streaming API request with %s messages", len(formatted_messages))
+                
+                client_index = self._acquire_client()
+                try:
+                    stream = await self._open_stream(client_index, formatted_messages)
+                    async for chunk in stream:
+                        if not chunk.choices:
+                            continue
+                        delta = chunk.choices[0].delta.content
+                        if delta:
+                            chunks.append(delta)
+                            yield delta
+                finally:
+                    self._inflight[client_index] -= 1
+        
+        except Exception as e:
+            logger.error("Error in stream_response: %s", e)
+            raise
+        
+        response_text = "".join(chunks).strip()
+        logger.info("Streamed response of length %s", len(response_text))
+        
+        if cache_key is not None:
+            self._cache_put(cache_key, response_text)
+
+    @_retry_transient
+    async def _open_stream(self, client_index: int, messages: List[Dict[str, str]]):
+        """
+        Start a streamed chat completion, retrying transient errors before
+        any chunk has been received.
+        
+        Args:
+            client_index (int): Index of the client to send the request with
+            messages (List[Dict[str, str]]): Fully formatted request messages
+            
+        Returns:
+            AsyncStream: The response stream
+        """
+        import openai
+        
+        await self._handle_rate_limit()
+        try:
+            return await self._clients[client_index].chat.completions.create(
+                model=self.model,
+                messages=messages,
+                temperature=self.temperature,
+                max_tokens=self.max_tokens,
+                stream=True
+            )
+        except openai.RateLimitError as e:
+            await self._handle_rate_limit_error(e)
+            raise
+
+    async def generate_batch(
+        self,
+        message_lists: List[List[Dict[str, str]]],
+        system_prompt: Optional[str] = None
+    ) -> List[str]:
+        """
+        Generate responses for several conversations concurrently.
+        
+        Requests overlap while waiting on the API, bounded by the
+        MAX_CONCURRENT_REQUESTS setting and spaced by the rate limiter.
+        
+        Args:
+            message_lists (List[List[Dict[str, str]]]): One message list per request
+            system_prompt (Optional[str]): Optional system prompt to prepend to each
+            
+        Returns:
+            List[str]: Generated responses, in the same order as the input
+        """
+        return await asyncio.gather(*(
+            self.generate_response(messages, system_prompt=system_prompt)
+            for messages in message_lists
+        ))
+
+    async def _handle_rate_limit(self) -> None:
+        """
+        Implement basic rate limiting to prevent API abuse.
+        Waits without blocking the event loop so other requests can proceed.
+        The interval grows with each rate limit error seen in the recent window
+        so requests slow down before the server starts rejecting them again.
+        """
+        async with self._rate_limit_lock:
+            interval = self.min_request_interval * (1 + self._recent_rate_limit_hits())
+            time_since_last_request = time.monotonic() - self.last_request_time
+            
+            if time_since_last_request < interval:
+                sleep_time = interval - time_since_last_request
+                logger.debug("Rate limiting: sleeping for %.2f seconds", sleep_time)
+                await asyncio.sleep(sleep_time)
+            
+            self.last_request_time = time.monotonic()
+
+    async def analyze_sentiment(
+        self,
+        text: str,
+        batch_queue: Optional[BatchQueue] = None
+    ) -> Union[Dict[str, float], str]:
         """
         Analyze the sentiment of given text using the GPT model.
         
         Args:
             text (str): Text to analyze
+            batch_queue (Optional[BatchQueue]): If given, queue the request for the
+                Batch API instead of calling the model immediately
             
         Returns:
-            Dict[str, float]: Dictionary containing sentiment scores
+            Union[Dict[str, float], str]: Dictionary containing sentiment scores,
+            or the batch custom_id if the request was queued
         """
         prompt = f"""
         Please analyze the sentiment of the following text and respond with only a JSON object containing these scores:
@@ -139,33 +532,42 @@ class APIHandler:
         Text: "{text}"
         """
         
+        messages = [{"role": "user", "content": prompt}]
+        if batch_queue is not None:
+            return batch_queue.add(self.build_batch_body(messages))
+        
         try:
-            response = await self.generate_response([
-                {"role": "user", "content": prompt}
-            ])
+            response = await self.generate_response(messages)
             
-            # TODO: Parse JSON response and return sentiment scores
-            # This is a placeholder implementation
+            # Parse the JSON object, ignoring any text or code fences around it
+            start, end = response.find("{"), response.rfind("}") + 1
+            scores = orjson.loads(response[start:end])
             return {
-                "positive": 0.5,
-                "negative": 0.2,
-                "neutral": 0.3
+                key: float(scores.get(key, 0.0))
+                for key in ("positive", "negative", "neutral")
             }
             
         except Exception as e:
-            logger.error(f"Error in sentiment analysis: {str(e)}")
+            logger.error("Error in sentiment analysis: %s", e)
             raise
 
-    async def summarize_context(self, context: str, max_length: int = 100) -> str:
+    async def summarize_context(
+        self,
+        context: str,
+        max_length: int = 100,
+        batch_queue: Optional[BatchQueue] = None
+    ) -> str:
         """
         Generate a concise summary of the given context.
         
         Args:
             context (str): Text to summarize
             max_length (int): Maximum length of summary in tokens
+            batch_queue (Optional[BatchQueue]): If given, queue the request for the
+                Batch API instead of calling the model immediately
             
         Returns:
-            str: Summarized text
+            str: Summarized text, or the batch custom_id if the request was queued
         """
         prompt = f"""
         Please provide a concise summary of the following context in no more than {max_length} tokens:
@@ -173,17 +575,155 @@ class APIHandler:
         {context}
         """
         
+        messages = [{"role": "user", "content": prompt}]
+        if batch_queue is not None:
+            return batch_queue.add(self.build_batch_body(messages))
+        
         try:
-            return await self.generate_response([
-                {"role": "user", "content": prompt}
-            ])
+            return await self.generate_response(messages)
             
         except Exception as e:
-            logger.error(f"Error in context summarization: {str(e)}")
+            logger.error("Error in context summarization: %s", e)
             raise
 
+    def build_batch_body(self, messages: List[Dict[str, str]]) -> Dict[str, Any]:
+        """
+        Build a chat completions request body for use in a batch.
+        
+        Args:
+            messages (List[Dict[str, str]]): List of message dictionaries
+            
+        Returns:
+            Dict[str, Any]: Request body using the handler's model settings
+        """
+        return {
+            "model": self.model,
+            "messages": messages,
+            "temperature": self.temperature,
+            "max_tokens": self.max_tokens
+        }
+
+    async def submit_batch(self, requests: List[Dict[str, Any]]) -> str:
+        """
+        Upload requests as a JSONL file and start a Batch API job.
+        
+        Args:
+            requests (List[Dict[str, Any]]): Batch request lines, e.g. from BatchQueue.drain()
+            
+        Returns:
+            str: ID of the created batch
+        """
+        payload = b"\n".join(orjson.dumps(request) for request in requests)
+        
+        try:
+            batch_file = await self._client.files.create(
+                file=("batch.jsonl", payload),
+                purpose="batch"
+            )
+            batch = await self._client.batches.create(
+                input_file_id=batch_file.id,
+                endpoint=BATCH_ENDPOINT,
+                completion_window="24h"
+            )
+            logger.info("Submitted batch %s with %s requests", batch.id, len(requests))
+            return batch.id
+            
+        except Exception as e:
+            logger.error("Error submitting batch: %s", e)
+            raise
+
+    async def poll_batch(self, batch_id: str) -> str:
+        """
+        Check the status of a Batch API job.
+        
+        Args:
+            batch_id (str): ID of the batch
+            
+        Returns:
+            str: Batch status (e.g. "in_progress", "completed", "failed")
+        """
+        batch = await self._client.batches.retrieve(batch_id)
+        logger.debug("Batch %s status: %s", batch_id, batch.status)
+        return batch.status
+
+    async def fetch_batch_results(self, batch_id: str) -> Dict[str, str]:
+        """
+        Download the results of a completed Batch API job.
+        
+        Args:
+            batch_id (str): ID of the batch
+            
+        Returns:
+            Dict[str, str]: Response text keyed by request custom_id
+            
+        Raises:
+            RuntimeError: If the batch has not completed yet
+        """
+        batch = await self._client.batches.retrieve(batch_id)
+        if batch.status != "completed" or not batch.output_file_id:
+            raise RuntimeError(f"Batch {batch_id} is not completed (status: {batch.status})")
+        
+        content = await self._client.files.content(batch.output_file_id)
+        results = {}
+        for line in content.text.splitlines():
+            if not line.strip():
+                continue
+            record = orjson.loads(line)
+            response = record.get("response") or {}
+            if response.get("status_code") != 200:
+                logger.warning("Batch request %s failed", record.get('custom_id'))
+                continue
+            choices = response["body"]["choices"]
+            results[record["custom_id"]] = choices[0]["message"]["content"].strip()
+        
+        logger.info("Fetched %s results from batch %s", len(results), batch_id)
+        return results
+
+    async def warmup(self) -> None:
+        """
+        Open and keep alive a connection to every endpoint before the first
+        real request, by sending each a minimal one-token completion. The
+        requests go through the same concurrency limit, rate limiter and
+        in-flight accounting as any other request. Failures are logged and
+        otherwise ignored.
+        """
+        async def ping(index: int) -> None:
+            async with self._request_semaphore:
+                await self._handle_rate_limit()
+                self._inflight[index] += 1
+                try:
+                    await self._clients[index].chat.completions.create(
+                        model=self.model,
+                        messages=[{"role": "user", "content": "ping"}],
+                        max_tokens=1
+                    )
+                finally:
+                    self._inflight[index] -= 1
+        
+        results = await asyncio.gather(*(ping(index) for index in range(len(self._clients))),
+                                       return_exceptions=True)
+        failures = [result for result in results if isinstance(result, Exception)]
+        for error in failures:
+            logger.warning("API warmup request failed: %s", error)
+        logger.debug("Warmed up %s API connection(s)", len(self._clients) - len(failures))
+
+    async def aclose(self) -> None:
+        """
+        Close the pooled HTTP connections.
+        """
+        try:
+            await self._http.aclose()
+        except Exception as e:
+            logger.error("Error closing HTTP client: %s", e)
+
     def cleanup(self) -> None:
         """
         Cleanup any resources used by the API handler.
         """
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            asyncio.run(self.aclose())
+        else:
+            self._close_task = loop.create_task(self.aclose())
         logger.info("APIHandler cleanup completed") 
\ No newline at end of file
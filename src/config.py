@@ -3,14 +3,14 @@ Configuration management module for the AI Assistant project.
 Handles environment variables, default settings, and hardware configurations.
 """
 
+import functools
 import os
-from typing import Dict, Any
-from dotenv import load_dotenv
+from typing import Any, Callable, Dict, List
 
 # Default configurations
 DEFAULT_SETTINGS = {
     # Text-to-Speech settings
-    "TTS_VOICE_ID": "en-US-1",  # Default voice ID
+    "TTS_VOICE_MODEL": "en_US-lessac-medium.onnx",  # Piper voice model
     "TTS_RATE": 150,            # Words per minute
     "TTS_VOLUME": 0.8,          # Volume level (0.0 to 1.0)
     
@@ -18,11 +18,31 @@ DEFAULT_SETTINGS = {
     "STT_LANGUAGE": "en-US",    # Default language
     "STT_TIMEOUT": 5,           # Recognition timeout in seconds
     "STT_PHRASE_TIMEOUT": 1.5,  # Seconds of silence to mark end of phrase
+    "STT_MODEL": "small",       # faster-whisper model size used for transcription
+    "VAD_MODEL_PATH": "silero_vad.onnx",  # Silero VAD model gating wake word recognition
+    "PICOVOICE_ACCESS_KEY": None,         # Enables Porcupine wake word detection when set
+    "PORCUPINE_KEYWORD_PATH": None,       # Porcupine keyword model (.ppn) for the wake word
+    "WAKE_WORDS": ["wunderkind"],         # Matched as whole words when no keyword spotter is used
+    "WAKE_WORD_MODEL": None,              # openWakeWord model (.onnx); used when Porcupine is not
+    "WAKE_WORD_THRESHOLD": 0.5,           # openWakeWord score that counts as a detection
     
     # OpenAI API settings
+    # Prefer models with prompt caching: the system prompt keeps its static
+    # instructions first so the prefix is reused across conversation turns.
     "OPENAI_MODEL": "gpt-4o",
     "OPENAI_MAX_TOKENS": 150,
     "OPENAI_TEMPERATURE": 0.7,
+    "MAX_CONCURRENT_REQUESTS": 5,     # Requests allowed in flight at once
+    "RATE_LIMIT_WINDOW": 60.0,        # seconds of 429 history used to slow requests down
+    "API_TIMEOUT": 30,                # seconds
+    "HTTP_MAX_CONNECTIONS": 20,       # Pooled keep-alive connections
+    "OPENAI_ENDPOINTS": None,         # Optional list of {"api_key", "base_url"} dicts to balance across
+    
+    # Response cache settings (caching is skipped above the temperature limit)
+    "RESPONSE_CACHE_SIZE": 1024,
+    "RESPONSE_CACHE_TTL": 3600,          # seconds
+    "RESPONSE_CACHE_MAX_TEMPERATURE": 0.3,
+    "PROMPT_CACHE_SIZE": 128,            # Repeated prompts remembered per conversation
     
     # Hardware PIN configurations (BCM mode)
     "LED_PIN": 18,              # Status LED
@@ -49,9 +69,38 @@ DEFAULT_SETTINGS = {
     "ENABLE_SERVO": False,      # Set to True to enable servo functionality
 }
 
+def _split_list(value: str) -> List[str]:
+    """Parse a comma-separated environment variable into a list of strings."""
+    return [item.strip() for item in value.split(",") if item.strip()]
+
+# Optional environment variables and the type each value is converted to
+_ENV_SCHEMA: Dict[str, Callable[[str], Any]] = {
+    "TTS_VOICE_MODEL": str,
+    "TTS_RATE": int,
+    "TTS_VOLUME": float,
+    "STT_LANGUAGE": str,
+    "OPENAI_MODEL": str,
+    "PICOVOICE_ACCESS_KEY": str,
+    "PORCUPINE_KEYWORD_PATH": str,
+    "WAKE_WORDS": _split_list,
+    "WAKE_WORD_MODEL": str,
+    "WAKE_WORD_THRESHOLD": float,
+    "MQTT_BROKER": str,
+    "MQTT_PORT": int,
+    "MQTT_USERNAME": str,
+    "MQTT_PASSWORD": str,
+}
+
+# Required environment variables
+_REQUIRED_VARS = (
+    "OPENAI_API_KEY",
+)
+
 def load_config() -> Dict[str, Any]:
     """
     Load configuration from environment variables and combine with default settings.
+    The environment is only read on the first call; later calls return a copy of
+    the cached configuration.
     
     Returns:
         Dict[str, Any]: Combined configuration dictionary with environment variables
@@ -60,58 +109,47 @@ def load_config() -> Dict[str, Any]:
     Raises:
         ValueError: If required environment variables are missing.
     """
-    # Load environment variables from .env file
+    return dict(_load_config_cached())
+
+@functools.lru_cache(maxsize=1)
+def _load_config_cached() -> Dict[str, Any]:
+    """
+    Build the configuration dictionary from the environment.
+    
+    Returns:
+        Dict[str, Any]: Combined configuration dictionary.
+    
+    Raises:
+        ValueError: If required environment variables are missing.
+    """
+    # Load environment variables from .env file (imported lazily to keep
+    # startup fast for processes that never load the configuration)
+    from dotenv import load_dotenv
     load_dotenv()
+    env = os.environ
     
     # Initialize config with default settings
     config = DEFAULT_SETTINGS.copy()
     
-    # Required environment variables
-    required_vars = [
-        "OPENAI_API_KEY",
-    ]
-    
-    # Optional environment variables with their corresponding config keys
-    optional_vars = {
-        "TTS_VOICE_ID": "TTS_VOICE_ID",
-        "TTS_RATE": "TTS_RATE",
-        "TTS_VOLUME": "TTS_VOLUME",
-        "STT_LANGUAGE": "STT_LANGUAGE",
-        "OPENAI_MODEL": "OPENAI_MODEL",
-        "MQTT_BROKER": "MQTT_BROKER",
-        "MQTT_PORT": "MQTT_PORT",
-        "MQTT_USERNAME": "MQTT_USERNAME",
-        "MQTT_PASSWORD": "MQTT_PASSWORD",
-    }
-    
     # Check for required environment variables
-    missing_vars = []
-    for var in required_vars:
-        value = os.getenv(var)
-        if value is None:
-            missing_vars.append(var)
-        else:
-            config[var] = value
-    
+    missing_vars = [var for var in _REQUIRED_VARS if var not in env]
     if missing_vars:
         raise ValueError(
             f"Missing required environment variables: {', '.join(missing_vars)}"
         )
+    for var in _REQUIRED_VARS:
+        config[var] = env[var]
     
-    # Load optional environment variables if they exist
-    for env_var, config_key in optional_vars.items():
-        value = os.getenv(env_var)
-        if value is not None:
-            # Convert string values to appropriate types
-            if config_key in config and isinstance(config[config_key], (int, float)):
-                try:
-                    if isinstance(config[config_key], int):
-                        value = int(value)
-                    else:
-                        value = float(value)
-                except ValueError:
-                    continue
-            config[config_key] = value
+    # Load optional environment variables if they exist, converting each
+    # to the type declared in the schema (invalid values are ignored)
+    for key, cast in _ENV_SCHEMA.items():
+        value = env.get(key)
+        if value is None:
+            continue
+        try:
+            config[key] = cast(value)
+        except ValueError:
+            continue
     
     return config
 
@@ -6,9 +6,15 @@ Manages conversation and updates the 'world state' with relevant facts or
 structured info. We also handle hardware references in a naive manner.
 """
 
-import openai
+import asyncio
+import hashlib
 import logging
-from typing import List, Dict, Optional
+import re
+from logging.handlers import RotatingFileHandler
+from collections import OrderedDict, deque
+from pathlib import Path
+from typing import AsyncIterator, List, Dict, Optional, Set, Tuple, Union
+import orjson
 from time import time
 from src.config import load_config
 from src.data.world_model import WorldModel
@@ -16,26 +22,46 @@ from src.api.api_handler import APIHandler
 
 # Configure logger
 logger = logging.getLogger(__name__)
-logger.setLevel(logging.INFO)
 
-console_handler = logging.StreamHandler()
-console_handler.setLevel(logging.INFO)
-console_formatter = logging.Formatter('%(levelname)s: %(message)s')
-console_handler.setFormatter(console_formatter)
+def _setup_logging() -> None:
+    """
+    Attach console and rotating file handlers to the module logger.
+    Safe to call repeatedly; handlers are only added once.
+    """
+    if logger.handlers:
+        return
+    logger.setLevel(logging.INFO)
+
+    console_handler = logging.StreamHandler()
+    console_handler.setLevel(logging.INFO)
+    console_formatter = logging.Formatter('%(levelname)s: %(message)s')
+    console_handler.setFormatter(console_formatter)
 
-file_handler = logging.FileHandler('chat_handler_world.log')
-file_handler.setLevel(logging.DEBUG)
-file_formatter = logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s')
-file_handler.setFormatter(file_formatter)
+    file_handler = RotatingFileHandler(
+        'chat_handler_world.log', maxBytes=5_000_000, backupCount=3
+    )
+    file_handler.setLevel(logging.DEBUG)
+    file_formatter = logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+    file_handler.setFormatter(file_formatter)
 
-logger.addHandler(console_handler)
-logger.addHandler(file_handler)
+    logger.addHandler(console_handler)
+    logger.addHandler(file_handler)
+
+_setup_logging()
 
 class ChatHandlerWorld:
     """
     A ChatHandler extension that integrates with a WorldModel.
     """
 
+    # Patterns used to extract facts from assistant responses
+    _LEARNED_RE = re.compile(r"I learned that\s+(.+?)(?:[.\n]|$)", re.IGNORECASE)
+    _PREFER_RE = re.compile(r"you prefer\s+(.+?)(?:[.\n]|$)", re.IGNORECASE)
+    _HARDWARE_RE = re.compile(r"\b(button|motion|sensor|led)\b", re.IGNORECASE)
+
+    # Prompts whose answer depends on the current time are never answered from cache
+    _TIME_SENSITIVE_RE = re.compile(r"\b(now|today|time)\b", re.IGNORECASE)
+
     def __init__(self, world_model: Optional[WorldModel] = None, config: Optional[dict] = None):
         """
         Initialize ChatHandlerWorld with a WorldModel instance and configuration.
@@ -51,8 +77,38 @@ class ChatHandlerWorld:
         # Initialize API handler
         self.api_handler = APIHandler(self.config)
 
-        self.conversation_history: List[Dict[str, str]] = []
         self.max_history = self.config.get("MAX_CONVERSATION_HISTORY", 10)
+        # Bounded so old turns are evicted automatically (x2 to hold user/assistant pairs).
+        # Messages are stored in the shape the API expects; timestamps are kept alongside.
+        self._messages: deque = deque(maxlen=self.max_history * 2)
+        self._timestamps: deque = deque(maxlen=self.max_history * 2)
+
+        # Static prompt settings, read once. The system message never changes,
+        # so the request prefix stays identical across turns.
+        self._system_prompt = self.config.get("SYSTEM_PROMPT", "You are a helpful AI assistant.")
+        self._system_message = {
+            "role": "system",
+            "content": (
+                f"{self._system_prompt}\n\n"
+                "Use the known facts provided after the conversation to give coherent "
+                "answers while respecting user context."
+            )
+        }
+
+        # (world model version, message) of the last built world model context message
+        self._context_msg_cache: Optional[Tuple[int, Dict[str, str]]] = None
+
+        # Recent prompt -> response map so exact repeats skip the API call.
+        # Only used when responses are near-deterministic.
+        self._prompt_cache: "OrderedDict[bytes, str]" = OrderedDict()
+        self._prompt_cache_size = self.config.get("PROMPT_CACHE_SIZE", 128)
+        self._prompt_cache_enabled = (
+            self.config.get("OPENAI_TEMPERATURE", 0.7)
+            <= self.config.get("RESPONSE_CACHE_MAX_TEMPERATURE", 0.3)
+        )
+
+        # World model updates running in the background
+        self._background_tasks: Set[asyncio.Task] = set()
 
         logger.info("ChatHandlerWorld initialized successfully")
 
@@ -70,60 +126,186 @@ class ChatHandlerWorld:
             Exception: If API request fails
         """
         try:
-            logger.info(f"User prompt: {prompt}")
-
-            # Add user message to history
-            self.conversation_history.append({
-                "role": "user",
-                "content": prompt,
-                "timestamp": str(time())
-            })
-
-            # Build prompt with system message and world model summary
-            system_prompt = self.config.get("SYSTEM_PROMPT", "You are a helpful AI assistant.")
-            world_summary = self.world_model.get_summary()
-            full_system_prompt = (
-                f"{system_prompt}\n\n"
-                f"Here is a summary of known facts and events so far:\n{world_summary}\n\n"
-                "Use this information to provide coherent answers while respecting user context."
-            )
+            logger.info("User prompt: %s", prompt)
 
-            # Prepare messages for the API request
-            messages = [
-                {"role": "system", "content": full_system_prompt},
-            ]
-            # Include recent conversation history
-            recent_history = self.conversation_history[-self.max_history:]
-            for msg in recent_history:
-                messages.append({"role": msg["role"], "content": msg["content"]})
+            # Answer exact repeats of a recent prompt without calling the API
+            cache_key = self._prompt_cache_key(prompt)
+            cached = self._get_cached_response(prompt, cache_key)
+            if cached is not None:
+                return cached
 
-            logger.debug(f"Full messages for LLM: {messages}")
+            messages = self._prepare_messages(prompt)
 
             # Generate response using API handler
-            response_text = await self.api_handler.generate_response(
-                messages,
-                system_prompt=full_system_prompt
-            )
+            response_text = await self.api_handler.generate_response(messages)
 
-            logger.info(f"Assistant response: {response_text}")
+            logger.info("Assistant response: %s", response_text)
+            self._record_response(cache_key, response_text)
 
-            # Add assistant response to history
-            self.conversation_history.append({
-                "role": "assistant",
-                "content": response_text,
-                "timestamp": str(time())
-            })
+            return response_text
 
-            # Update world model with any discovered facts
-            self._update_world_model_from_response(response_text)
+        except Exception as e:
+            logger.error("Error in generate_response: %s", e)
+            raise
 
-            return response_text
+    async def stream_response(self, prompt: str) -> AsyncIterator[str]:
+        """
+        Stream a response from the LLM as it is generated, then update the
+        history and world model once it is complete.
+        
+        Args:
+            prompt (str): User's input text
+            
+        Yields:
+            str: Chunks of the response text
+            
+        Raises:
+            Exception: If API request fails
+        """
+        try:
+            logger.info("User prompt: %s", prompt)
+
+            cache_key = self._prompt_cache_key(prompt)
+            cached = self._get_cached_response(prompt, cache_key)
+            if cached is not None:
+                yield cached
+                return
+
+            messages = self._prepare_messages(prompt)
+
+            chunks = []
+            async for chunk in self.api_handler.stream_response(messages):
+                chunks.append(chunk)
+                yield chunk
+
+            response_text = "".join(chunks).strip()
+            logger.info("Assistant response: %s", response_text)
+            self._record_response(cache_key, response_text)
 
         except Exception as e:
-            error_msg = f"Error in generate_response: {str(e)}"
-            logger.error(error_msg)
+            logger.error("Error in stream_response: %s", e)
             raise
 
+    def _get_cached_response(self, prompt: str, cache_key: Optional[bytes]) -> Optional[str]:
+        """
+        Answer a repeated prompt from the conversation cache, recording the turn.
+        
+        Args:
+            prompt (str): User's input text
+            cache_key (Optional[bytes]): Key from _prompt_cache_key
+            
+        Returns:
+            Optional[str]: Cached response text, or None on miss
+        """
+        if cache_key is None or cache_key not in self._prompt_cache:
+            return None
+        
+        response_text = self._prompt_cache[cache_key]
+        self._prompt_cache.move_to_end(cache_key)
+        self._append_message("user", prompt)
+        self._append_message("assistant", response_text)
+        logger.info("Assistant response (repeated prompt): %s", response_text)
+        return response_text
+
+    def _prepare_messages(self, prompt: str) -> List[Dict[str, str]]:
+        """
+        Add the user prompt to the history and build the API request messages.
+        
+        Args:
+            prompt (str): User's input text
+            
+        Returns:
+            List[Dict[str, str]]: Static system message, the recent conversation
+            history, then the world model summary
+        """
+        self._append_message("user", prompt)
+        messages = [self._system_message, *self._messages, self._get_context_message()]
+        logger.debug("Full messages for LLM: %s", messages)
+        return messages
+
+    def _record_response(self, cache_key: Optional[bytes], response_text: str) -> None:
+        """
+        Add the assistant response to the history and caches, and update the
+        world model with any discovered facts in the background.
+        
+        Args:
+            cache_key (Optional[bytes]): Key from _prompt_cache_key
+            response_text (str): The assistant's response text
+        """
+        self._append_message("assistant", response_text)
+
+        if cache_key is not None:
+            self._prompt_cache[cache_key] = response_text
+            while len(self._prompt_cache) > self._prompt_cache_size:
+                self._prompt_cache.popitem(last=False)
+
+        # Run fact extraction in a worker thread so the caller isn't kept waiting
+        task = asyncio.create_task(
+            asyncio.to_thread(self._update_world_model_from_response, response_text)
+        )
+        self._background_tasks.add(task)
+        task.add_done_callback(self._on_background_task_done)
+
+    def _on_background_task_done(self, task: asyncio.Task) -> None:
+        """
+        Forget a finished background task and log any error it raised.
+        
+        Args:
+            task (asyncio.Task): The completed task
+        """
+        self._background_tasks.discard(task)
+        if not task.cancelled() and task.exception() is not None:
+            logger.error("Background world model update failed: %s", task.exception())
+
+    def _prompt_cache_key(self, prompt: str) -> Optional[bytes]:
+        """
+        Compute the repeated-prompt cache key for a user prompt. The key covers
+        only the utterance: the world model changes on every turn, so keying on
+        it would mean the cache never hits.
+        
+        Args:
+            prompt (str): User's input text
+            
+        Returns:
+            Optional[bytes]: Cache key, or None if the prompt must not be cached
+        """
+        if not self._prompt_cache_enabled or self._TIME_SENSITIVE_RE.search(prompt):
+            return None
+        return hashlib.blake2b(prompt.encode("utf-8"), digest_size=16).digest()
+
+    def _append_message(self, role: str, content: str) -> None:
+        """
+        Append a message to the conversation history.
+        
+        Args:
+            role (str): Message role ("user" or "assistant")
+            content (str): Message text
+        """
+        self._messages.append({"role": role, "content": content})
+        self._timestamps.append(time())
+
+    def _get_context_message(self) -> Dict[str, str]:
+        """
+        Build the message carrying the world model summary, reusing the previous
+        one while the world model is unchanged.
+        
+        The summary changes on nearly every turn, so it is sent after the
+        conversation history; the system message and history before it form a
+        prefix that models with provider-side prompt caching can reuse.
+        
+        Returns:
+            Dict[str, str]: System message containing the world model summary
+        """
+        version = self.world_model.version
+        if self._context_msg_cache is None or self._context_msg_cache[0] != version:
+            self._context_msg_cache = (
+                version,
+                {"role": "system", "content": f"KNOWN FACTS:\n{self.world_model.get_summary()}"}
+            )
+            logger.debug("Rebuilt world model context for version %s", version)
+        
+        return self._context_msg_cache[1]
+
     def _update_world_model_from_response(self, response_text: str) -> None:
         """
         Parse the response text for facts and update the world model accordingly.
@@ -133,32 +315,37 @@ class ChatHandlerWorld:
         """
         try:
             # Example fact extraction (naive approach)
-            if "I learned that" in response_text:
-                new_fact = response_text.split("I learned that")[-1].strip(". ")
+            match = self._LEARNED_RE.search(response_text)
+            if match:
+                new_fact = match.group(1).strip(". ")
                 self.world_model.add_fact(new_fact)
-                logger.debug(f"Added new fact to world model: {new_fact}")
+                logger.debug("Added new fact to world model: %s", new_fact)
 
             # Example preference extraction
-            if "you prefer" in response_text.lower():
-                preference_text = response_text.lower().split("you prefer")[1].strip(". ")
+            match = self._PREFER_RE.search(response_text)
+            if match:
+                preference_text = match.group(1).lower().strip(". ")
                 self.world_model.update_user_preference("user_preference", preference_text)
-                logger.debug(f"Updated user preference: {preference_text}")
+                logger.debug("Updated user preference: %s", preference_text)
 
-            # Example hardware event detection
-            hardware_keywords = ["button", "motion", "sensor", "led"]
-            for keyword in hardware_keywords:
-                if keyword in response_text.lower():
-                    self.world_model.update_hardware_event(
-                        f"Hardware interaction mentioned: {keyword}"
-                    )
-                    logger.debug(f"Recorded hardware event: {keyword}")
+            # Example hardware event detection (each keyword recorded once)
+            keywords = dict.fromkeys(
+                m.group(1).lower() for m in self._HARDWARE_RE.finditer(response_text)
+            )
+            for keyword in keywords:
+                self.world_model.update_hardware_event(
+                    f"Hardware interaction mentioned: {keyword}"
+                )
+                logger.debug("Recorded hardware event: %s", keyword)
 
         except Exception as e:
-            logger.error(f"Error updating world model: {str(e)}")
+            logger.error("Error updating world model: %s", e)
 
     def clear_history(self) -> None:
         """Clear the conversation history."""
-        self.conversation_history.clear()
+        self._messages.clear()
+        self._timestamps.clear()
+        self._prompt_cache.clear()
         logger.info("Conversation history cleared")
 
     def get_conversation_history(self) -> List[Dict[str, str]]:
@@ -168,7 +355,20 @@ class ChatHandlerWorld:
         Returns:
             List[Dict[str, str]]: List of conversation messages
         """
-        return self.conversation_history
+        return [
+            {**message, "timestamp": str(timestamp)}
+            for message, timestamp in zip(self._messages, self._timestamps)
+        ]
+
+    def save_conversation(self, path: Union[str, Path]) -> None:
+        """
+        Save the conversation history to a JSON file.
+        
+        Args:
+            path (Union[str, Path]): Destination file path
+        """
+        Path(path).write_bytes(orjson.dumps(self.get_conversation_history()))
+        logger.info("Conversation history saved to %s", path)
 
     def update_world_model(self, key: str, value: str) -> None:
         """
@@ -179,7 +379,7 @@ class ChatHandlerWorld:
             value (str): New value for the key
         """
         self.world_model.set_state(key, value)
-        logger.debug(f"World model updated with {key}: {value}")
+        logger.debug("World model updated with %s: %s", key, value)
 
     def get_world_summary(self) -> str:
         """
@@ -190,7 +390,23 @@ class ChatHandlerWorld:
         """
         return self.world_model.get_summary()
 
+    async def warmup(self) -> None:
+        """Establish the API connections ahead of the first user turn."""
+        await self.api_handler.warmup()
+
+    async def aclose(self) -> None:
+        """Wait for pending world model updates and close the API handler."""
+        pending = [task for task in self._background_tasks if not task.done()]
+        if pending:
+            await asyncio.gather(*pending, return_exceptions=True)
+        await self.api_handler.aclose()
+
     def cleanup(self) -> None:
         """Cleanup resources."""
         logger.info("Cleaning up ChatHandlerWorld resources")
-        self.api_handler.cleanup() 
\ No newline at end of file
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            asyncio.run(self.aclose())
+        else:
+            self._close_task = loop.create_task(self.aclose()) 
\ No newline at end of file
@@ -6,8 +6,11 @@ based on user interactions and hardware events. Provides methods for
 summarizing or structuring the stored data so it can be passed to an LLM.
 """
 
+import io
 import logging
-from typing import Dict, Any, Optional, List
+from collections import deque
+from threading import RLock
+from typing import Dict, Any, Optional, List, Tuple
 
 logger = logging.getLogger(__name__)
 
@@ -18,38 +21,58 @@ class WorldModel:
     conversation or hardware inputs.
     """
 
+    # Only the most recent entries are useful as LLM context
+    MAX_FACTS = 64
+    MAX_HARDWARE_EVENTS = 64
+
     def __init__(self):
         """
         Initialize the internal world state.
         """
         self.state: Dict[str, Any] = {}
-        self.facts: List[str] = []  # Could store discrete facts or statements
+        self.facts: deque = deque(maxlen=self.MAX_FACTS)  # Could store discrete facts or statements
 
         # Example specialized fields:
         self.user_preferences: Dict[str, Any] = {}
-        self.hardware_events: List[str] = []
+        self.hardware_events: deque = deque(maxlen=self.MAX_HARDWARE_EVENTS)
+
+        # Incremented on every mutation so callers can cache derived data
+        self.version = 0
+
+        # Guards mutations, which may come from hardware threads
+        self._lock = RLock()
+
+        # Summary text and the version it was built for
+        self._summary = ""
+        self._summary_version = -1
         logger.info("WorldModel initialized.")
 
     def add_fact(self, fact: str) -> None:
         """
         Add a new fact or piece of information to the world model.
         """
-        self.facts.append(fact)
-        logger.debug(f"Added fact: {fact}")
+        with self._lock:
+            self.facts.append(fact)
+            self.version += 1
+        logger.debug("Added fact: %s", fact)
 
     def update_hardware_event(self, event_description: str) -> None:
         """
         Log hardware-related events, such as motion detection, button press, etc.
         """
-        self.hardware_events.append(event_description)
-        logger.debug(f"Hardware event recorded: {event_description}")
+        with self._lock:
+            self.hardware_events.append(event_description)
+            self.version += 1
+        logger.debug("Hardware event recorded: %s", event_description)
 
     def set_state(self, key: str, value: Any) -> None:
         """
         Set (or update) a key-value pair in the internal state dictionary.
         """
-        self.state[key] = value
-        logger.debug(f"Set internal state [{key}]: {value}")
+        with self._lock:
+            self.state[key] = value
+            self.version += 1
+        logger.debug("Set internal state [%s]: %s", key, value)
 
     def get_state(self, key: str) -> Optional[Any]:
         """
@@ -63,31 +86,61 @@ class WorldModel:
         In a more advanced system, this could call an LLM to generate
         a short, compressed representation.
         """
-        # For now, we'll just create a naive textual summary.
-        lines = []
-        lines.append("Facts: " + "; ".join(self.facts) if self.facts else "No known facts yet.")
-        lines.append("Hardware Events: " + "; ".join(self.hardware_events) if self.hardware_events else "No hardware events recorded.")
-        lines.append(f"State keys: {list(self.state.keys())}" if self.state else "No internal state set yet.")
-        lines.append(f"User Preferences: {self.user_preferences}" if self.user_preferences else "No user preferences stored.")
-        summary_text = "\n".join(lines)
-        logger.debug(f"World model summary: {summary_text}")
+        with self._lock:
+            # Rebuilt only after the model has changed
+            if self._summary_version == self.version:
+                return self._summary
+
+            # For now, we'll just create a naive textual summary,
+            # written into a single buffer in one pass.
+            buf = io.StringIO()
+            self._write_items(buf, "Facts: ", self.facts, "No known facts yet.")
+            buf.write("\n")
+            self._write_items(buf, "Hardware Events: ", self.hardware_events, "No hardware events recorded.")
+            buf.write("\n")
+            buf.write(f"State keys: {list(self.state.keys())}" if self.state else "No internal state set yet.")
+            buf.write("\n")
+            buf.write(f"User Preferences: {self.user_preferences}" if self.user_preferences else "No user preferences stored.")
+            summary_text = buf.getvalue()
+            self._summary = summary_text
+            self._summary_version = self.version
+        logger.debug("World model summary: %s", summary_text)
         return summary_text
 
+    @staticmethod
+    def _write_items(buf: io.StringIO, label: str, items: deque, empty_text: str) -> None:
+        """
+        Write a labelled, "; "-separated list of items, or empty_text if there are none.
+        """
+        if not items:
+            buf.write(empty_text)
+            return
+        buf.write(label)
+        separator = ""
+        for item in items:
+            buf.write(separator)
+            buf.write(item)
+            separator = "; "
+
     def update_user_preference(self, preference_name: str, preference_value: Any) -> None:
         """
         Store or update a user preference in the world model.
         """
-        self.user_preferences[preference_name] = preference_value
-        logger.debug(f"Updated user preference [{preference_name}]: {preference_value}")
+        with self._lock:
+            self.user_preferences[preference_name] = preference_value
+            self.version += 1
+        logger.debug("Updated user preference [%s]: %s", preference_name, preference_value)
 
     def clear(self) -> None:
         """
         Clear the entire world model.
         """
-        self.state.clear()
-        self.facts.clear()
-        self.hardware_events.clear()
-        self.user_preferences.clear()
+        with self._lock:
+            self.state.clear()
+            self.facts.clear()
+            self.hardware_events.clear()
+            self.user_preferences.clear()
+            self.version += 1
         logger.info("WorldModel has been cleared.") 
 
     def update_hardware_state(self, component: str, state: Any) -> None:
@@ -98,8 +151,28 @@ class WorldModel:
             component (str): Hardware component identifier
             state (Any): Current state of the component
         """
-        if "hardware_state" not in self.state:
-            self.state["hardware_state"] = {}
+        with self._lock:
+            self.state.setdefault("hardware_state", {})[component] = state
+            self.version += 1
+        logger.debug("Updated hardware state: %s = %s", component, state)
+
+    def apply_batch(self, updates: List[Tuple[str, Any, Any]]) -> None:
+        """
+        Apply a batch of hardware updates under a single lock acquisition.
         
-        self.state["hardware_state"][component] = state
-        logger.debug(f"Updated hardware state: {component} = {state}") 
\ No newline at end of file
+        Args:
+            updates (List[Tuple[str, Any, Any]]): Updates in order, each either
+                ("hardware_state", component, state) or
+                ("hardware_event", description, None)
+        """
+        with self._lock:
+            hardware_state = self.state.setdefault("hardware_state", {})
+            for kind, key, value in updates:
+                if kind == "hardware_state":
+                    hardware_state[key] = value
+                elif kind == "hardware_event":
+                    self.hardware_events.append(key)
+                else:
+                    logger.warning("Ignoring unknown world model update: %s", kind)
+            self.version += 1
+        logger.debug("Applied %s world model updates", len(updates)) 
\ No newline at end of file
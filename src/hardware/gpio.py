@@ -0,0 +1,21 @@
+"""
+Selects the GPIO backend once at import time. Prefers the gpiod character
+device backend, then RPi.GPIO, and falls back to the mock wrapper so the
+project can be developed on machines without GPIO hardware.
+"""
+
+import logging
+
+logger = logging.getLogger(__name__)
+
+try:
+    from .gpiod_backend import GPIO
+    logger.debug("Using gpiod GPIO backend")
+except ImportError:
+    try:
+        import RPi.GPIO as GPIO
+        logger.debug("Using RPi.GPIO backend")
+    except ImportError:
+        from .gpio_wrapper import GPIOWrapper
+        GPIO = GPIOWrapper()
+        logger.debug("Using mock GPIO wrapper")
@@ -3,18 +3,32 @@ GPIO wrapper that allows for development on non-Raspberry Pi systems
 while maintaining the same interface as RPi.GPIO
 """
 
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Value returned by mock input reads
+_MOCK_HIGH = True
+
 class PWM:
     """Mock PWM class for development."""
     def __init__(self, pin, frequency):
         self.pin = pin
         self.frequency = frequency
-        print(f"PWM initialized on pin {pin} at {frequency}Hz")
-        
+        if __debug__ and logger.isEnabledFor(logging.DEBUG):
+            logger.debug("PWM initialized on pin %s at %sHz", pin, frequency)
+
     def start(self, duty_cycle):
-        print(f"PWM started with duty cycle {duty_cycle}%")
-        
+        if __debug__ and logger.isEnabledFor(logging.DEBUG):
+            logger.debug("PWM started with duty cycle %s%%", duty_cycle)
+
+    def ChangeDutyCycle(self, duty_cycle):
+        if __debug__ and logger.isEnabledFor(logging.DEBUG):
+            logger.debug("PWM duty cycle changed to %s%%", duty_cycle)
+
     def stop(self):
-        print("PWM stopped")
+        if __debug__ and logger.isEnabledFor(logging.DEBUG):
+            logger.debug("PWM stopped")
 
 class GPIOWrapper:
     BCM = "BCM"
@@ -23,38 +37,53 @@ class GPIOWrapper:
     OUT = "OUT"
     PUD_UP = "PUD_UP"
     PUD_DOWN = "PUD_DOWN"
+    RISING = "RISING"
+    FALLING = "FALLING"
+    BOTH = "BOTH"
+    HIGH = 1
+    LOW = 0
 
-    @staticmethod
-    def setmode(mode):
-        print(f"GPIO.setmode({mode})")
-
-    @staticmethod
-    def setup(pin, mode, pull_up_down=None):
-        if pull_up_down:
-            print(f"GPIO.setup(pin={pin}, mode={mode}, pull_up_down={pull_up_down})")
-        else:
-            print(f"GPIO.setup(pin={pin}, mode={mode})")
-
-    @staticmethod
-    def input(pin):
-        print(f"GPIO.input(pin={pin})")
-        return True  # Mock return value
-
-    @staticmethod
-    def output(pin, value):
-        print(f"GPIO.output(pin={pin}, value={value})")
-
-    @staticmethod
-    def cleanup():
-        print("GPIO.cleanup()")
-
-    @staticmethod
-    def PWM(pin, frequency):
-        print(f"Creating PWM instance for pin {pin}")
-        return PWM(pin, frequency)
+    def __init__(self):
+        self._debug = logger.isEnabledFor
+
+    def setmode(self, mode):
+        if __debug__ and self._debug(logging.DEBUG):
+            logger.debug("GPIO.setmode(%s)", mode)
 
-# Usage in your main code
-try:
-    import RPi.GPIO as GPIO
-except ImportError:
-    GPIO = GPIOWrapper() 
\ No newline at end of file
+    def setup(self, pin, mode, pull_up_down=None):
+        if __debug__ and self._debug(logging.DEBUG):
+            if pull_up_down:
+                logger.debug("GPIO.setup(pin=%s, mode=%s, pull_up_down=%s)", pin, mode, pull_up_down)
+            else:
+                logger.debug("GPIO.setup(pin=%s, mode=%s)", pin, mode)
+
+    def input(self, pin):
+        if __debug__ and self._debug(logging.DEBUG):
+            logger.debug("GPIO.input(pin=%s)", pin)
+        return _MOCK_HIGH
+
+    def input_many(self, pins):
+        if __debug__ and self._debug(logging.DEBUG):
+            logger.debug("GPIO.input_many(pins=%s)", pins)
+        return [_MOCK_HIGH for _ in pins]
+
+    def output(self, pin, value):
+        if __debug__ and self._debug(logging.DEBUG):
+            logger.debug("GPIO.output(pin=%s, value=%s)", pin, value)
+
+    def add_event_detect(self, pin, edge, callback=None, bouncetime=None):
+        if __debug__ and self._debug(logging.DEBUG):
+            logger.debug("GPIO.add_event_detect(pin=%s, edge=%s, bouncetime=%s)", pin, edge, bouncetime)
+
+    def remove_event_detect(self, pin):
+        if __debug__ and self._debug(logging.DEBUG):
+            logger.debug("GPIO.remove_event_detect(pin=%s)", pin)
+
+    def cleanup(self):
+        if __debug__ and self._debug(logging.DEBUG):
+            logger.debug("GPIO.cleanup()")
+
+    def PWM(self, pin, frequency):
+        if __debug__ and self._debug(logging.DEBUG):
+            logger.debug("Creating PWM instance for pin %s", pin)
+        return PWM(pin, frequency)
@@ -0,0 +1,232 @@
+"""
+GPIO backend built on the libgpiod v2 character device API, exposing the
+same interface as RPi.GPIO. All configured lines share a single line request,
+so each read or write is one ioctl on a file descriptor that stays open, and
+edge events are delivered by a single thread blocking in poll().
+"""
+
+import logging
+import os
+import threading
+import time
+from datetime import timedelta
+
+import gpiod
+from gpiod.line import Bias, Direction, Edge, Value
+
+logger = logging.getLogger(__name__)
+
+# GPIO chip exposing the header pins (line offsets match BCM numbering)
+DEFAULT_CHIP = "/dev/gpiochip0"
+
+# Seconds the edge thread blocks in poll() before checking for shutdown
+EDGE_WAIT_TIMEOUT = 0.1
+
+if not os.path.exists(DEFAULT_CHIP):
+    raise ImportError(f"GPIO chip {DEFAULT_CHIP} not found")
+
+class PWM:
+    """
+    Software PWM driven from a background thread, which sleeps until the duty
+    cycle is non-zero.
+
+    Pulse timing relies on time.sleep, so edges jitter by the scheduler's
+    wake-up latency (often 0.1 ms or more). That is fine for LEDs but makes
+    servos twitch; drive servos from a hardware PWM channel where available.
+    """
+    def __init__(self, backend, pin, frequency):
+        self._backend = backend
+        self.pin = pin
+        self.period = 1.0 / frequency
+        self.duty_cycle = 0.0
+        self._stop = threading.Event()
+        self._active = threading.Event()
+        self._thread = None
+
+    def start(self, duty_cycle):
+        self.ChangeDutyCycle(duty_cycle)
+        if self._thread is None:
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name=f"pwm-{self.pin}", daemon=True)
+            self._thread.start()
+
+    def ChangeDutyCycle(self, duty_cycle):
+        self.duty_cycle = duty_cycle
+        if duty_cycle > 0:
+            self._active.set()
+        else:
+            self._active.clear()
+
+    def stop(self):
+        if self._thread is not None:
+            self._stop.set()
+            self._active.set()  # Wake the thread if it is parked
+            self._thread.join()
+            self._thread = None
+        self._backend.output(self.pin, 0)
+
+    def _run(self):
+        while not self._stop.is_set():
+            if not self._active.is_set():
+                # Hold the line low and park until the duty cycle is raised
+                self._backend.output(self.pin, 0)
+                self._active.wait()
+                continue
+            high_time = self.period * self.duty_cycle / 100.0
+            if high_time > 0:
+                self._backend.output(self.pin, 1)
+                time.sleep(high_time)
+            if high_time < self.period:
+                self._backend.output(self.pin, 0)
+                time.sleep(self.period - high_time)
+
+class GPIODBackend:
+    BCM = "BCM"
+    BOARD = "BOARD"
+    IN = "IN"
+    OUT = "OUT"
+    PUD_UP = "PUD_UP"
+    PUD_DOWN = "PUD_DOWN"
+    RISING = "RISING"
+    FALLING = "FALLING"
+    BOTH = "BOTH"
+    HIGH = 1
+    LOW = 0
+
+    _EDGES = {RISING: Edge.RISING, FALLING: Edge.FALLING, BOTH: Edge.BOTH}
+    _BIASES = {PUD_UP: Bias.PULL_UP, PUD_DOWN: Bias.PULL_DOWN}
+
+    def __init__(self, chip_path=DEFAULT_CHIP):
+        self._chip_path = chip_path
+        self._chip = None
+        self._request = None
+        self._settings = {}
+        self._callbacks = {}
+        self._lock = threading.Lock()
+        self._edge_thread = None
+        self._stop_edges = threading.Event()
+        self._pwms = []
+
+    def setmode(self, mode):
+        if mode != self.BCM:
+            raise ValueError("gpiod backend only supports BCM pin numbering")
+
+    def setup(self, pin, mode, pull_up_down=None):
+        if mode == self.OUT:
+            settings = gpiod.LineSettings(direction=Direction.OUTPUT, output_value=Value.INACTIVE)
+        else:
+            settings = gpiod.LineSettings(direction=Direction.INPUT,
+                                          bias=self._BIASES.get(pull_up_down, Bias.AS_IS))
+        with self._lock:
+            self._settings[pin] = settings
+            self._apply_settings(new_lines=True)
+        logger.debug("gpiod setup(pin=%s, mode=%s, pull_up_down=%s)", pin, mode, pull_up_down)
+
+    def input(self, pin):
+        with self._lock:
+            value = self._request.get_value(pin)
+        return 1 if value == Value.ACTIVE else 0
+
+    def input_many(self, pins):
+        """Read several pins with a single ioctl."""
+        with self._lock:
+            values = self._request.get_values(list(pins))
+        return [1 if value == Value.ACTIVE else 0 for value in values]
+
+    def output(self, pin, value):
+        with self._lock:
+            self._request.set_value(pin, Value.ACTIVE if value else Value.INACTIVE)
+
+    def add_event_detect(self, pin, edge, callback=None, bouncetime=None):
+        with self._lock:
+            settings = self._settings[pin]
+            settings.edge_detection = self._EDGES[edge]
+            if bouncetime:
+                settings.debounce_period = timedelta(milliseconds=bouncetime)
+            self._callbacks[pin] = callback
+            self._apply_settings()
+            if self._edge_thread is None:
+                self._stop_edges.clear()
+                self._edge_thread = threading.Thread(target=self._dispatch_edges,
+                                                     name="gpiod-edges", daemon=True)
+                self._edge_thread.start()
+        logger.debug("gpiod add_event_detect(pin=%s, edge=%s, bouncetime=%s)", pin, edge, bouncetime)
+
+    def remove_event_detect(self, pin):
+        with self._lock:
+            settings = self._settings[pin]
+            settings.edge_detection = Edge.NONE
+            settings.debounce_period = timedelta()
+            self._callbacks.pop(pin, None)
+            self._apply_settings()
+        if not self._callbacks:
+            self._stop_edge_thread()
+
+    def PWM(self, pin, frequency):
+        pwm = PWM(self, pin, frequency)
+        self._pwms.append(pwm)
+        return pwm
+
+    def cleanup(self):
+        self._stop_edge_thread()
+        for pwm in self._pwms:
+            pwm.stop()
+        self._pwms.clear()
+        with self._lock:
+            if self._request is not None:
+                self._request.release()
+                self._request = None
+            if self._chip is not None:
+                self._chip.close()
+                self._chip = None
+            self._settings.clear()
+            self._callbacks.clear()
+        logger.debug("gpiod cleanup()")
+
+    def _apply_settings(self, new_lines=False):
+        """Push the line settings to the kernel; must be called with the lock held."""
+        config = dict(self._settings)
+        if self._request is not None and not new_lines:
+            self._request.reconfigure_lines(config=config)
+            return
+        # Lines can't be added to an existing request, so request them all again
+        if self._request is not None:
+            self._request.release()
+        if self._chip is None:
+            self._chip = gpiod.Chip(self._chip_path)
+        self._request = self._chip.request_lines(config=config, consumer="wunderkind")
+
+    def _stop_edge_thread(self):
+        if self._edge_thread is not None:
+            self._stop_edges.set()
+            self._edge_thread.join()
+            self._edge_thread = None
+
+    def _dispatch_edges(self):
+        """Wait for edge events on all requested lines and run their callbacks."""
+        while not self._stop_edges.is_set():
+            # Wait without the lock so reads and writes aren't held up by poll()
+            with self._lock:
+                request = self._request
+            if request is None:
+                return
+            try:
+                ready = request.wait_edge_events(timedelta(seconds=EDGE_WAIT_TIMEOUT))
+            except Exception:
+                # The lines were re-requested while waiting; pick up the new request
+                continue
+            with self._lock:
+                events = []
+                # Events for a replaced request are dropped along with it
+                if ready and request is self._request:
+                    events = request.read_edge_events()
+                callbacks = dict(self._callbacks)
+            for event in events:
+                callback = callbacks.get(event.line_offset)
+                if callback is not None:
+                    try:
+                        callback(event.line_offset)
+                    except Exception as e:
+                        logger.error("Error in edge callback for pin %s: %s", event.line_offset, e)
+
+GPIO = GPIODBackend()
@@ -5,19 +5,25 @@ and update the WorldModel accordingly. This uses the GPIO wrapper logic to remai
 cross-platform compatible.
 """
 
+import atexit
 import logging
+import logging.handlers
+import os
 import time
-from typing import Optional, Dict, Any, Callable
+from queue import Empty, SimpleQueue
+from typing import Optional, Dict, Any, Callable, List
 from threading import Thread, Event
 
-# Attempt to import RPi.GPIO or fallback to the gpio_wrapper
-try:
-    import RPi.GPIO as GPIO
-except ImportError:
-    from gpio_wrapper import GPIO
+from src.hardware.gpio import GPIO
+from src.data.world_model import WorldModel
+from src.config import load_config, get_pin_config
 
-from data.world_model import WorldModel
-from config import load_config, get_pin_config
+# Debounce settings: a pin level counts once it reads the same for 32 samples
+DEBOUNCE_MASK = 0xFFFFFFFF
+DEBOUNCE_SAMPLE_INTERVAL = 0.001  # seconds (1 kHz sampling)
+
+# SCHED_FIFO priority for the monitor thread (needs CAP_SYS_NICE or an RTPRIO limit)
+MONITOR_THREAD_PRIORITY = 10
 
 # Configure logging
 logger = logging.getLogger(__name__)
@@ -37,7 +43,10 @@ file_handler.setFormatter(file_formatter)
 
 # Add handlers
 logger.addHandler(console_handler)
-logger.addHandler(file_handler)
+# Buffer file records in memory and write them in batches, or at once on errors
+buffered_file_handler = logging.handlers.MemoryHandler(256, flushLevel=logging.ERROR, target=file_handler)
+atexit.register(buffered_file_handler.flush)
+logger.addHandler(buffered_file_handler)
 
 class HardwareIntegration:
     """
@@ -62,14 +71,33 @@ class HardwareIntegration:
         self.button_pin = self.pin_config["BUTTON_PIN"]
         self.motion_sensor_pin = self.pin_config["MOTION_SENSOR_PIN"]
         self.servo_pin = self.pin_config["SERVO_PIN"]
+        self._servo_pwm = None
         
         # Event monitoring control
         self._stop_monitoring = Event()
+        self._edge_detected = Event()
         self._monitor_thread: Optional[Thread] = None
         
+        # Debounced level changes are handed from the real-time monitor thread
+        # to a normal-priority thread, which runs callbacks and logging
+        self._level_changes: SimpleQueue = SimpleQueue()
+        self._event_thread: Optional[Thread] = None
+        
+        # Debounce state per input pin
+        self._debounce_pins = (self.button_pin, self.motion_sensor_pin)
+        self._shift_registers: Dict[int, int] = {}
+        self._stable_levels: Dict[int, bool] = {}
+        self._input_many = getattr(GPIO, "input_many", None)
+        
         # Callback registry
         self.event_callbacks: Dict[str, Callable] = {}
         
+        # World model updates are queued here and applied in batches so GPIO
+        # callbacks never wait on the world model
+        self._update_queue: SimpleQueue = SimpleQueue()
+        self._update_thread = Thread(target=self._apply_updates, name="world-model-updates", daemon=True)
+        self._update_thread.start()
+        
         # Initialize GPIO
         self.setup_gpio()
         logger.info("Hardware integration initialized")
@@ -81,27 +109,30 @@ class HardwareIntegration:
             
             # Setup LED as output
             GPIO.setup(self.led_pin, GPIO.OUT)
-            logger.debug(f"LED pin {self.led_pin} configured as output")
+            logger.debug("LED pin %s configured as output", self.led_pin)
             
             # Setup button with pull-up resistor
             GPIO.setup(self.button_pin, GPIO.IN, pull_up_down=GPIO.PUD_UP)
-            logger.debug(f"Button pin {self.button_pin} configured with pull-up")
+            logger.debug("Button pin %s configured with pull-up", self.button_pin)
             
             # Setup motion sensor as input
             GPIO.setup(self.motion_sensor_pin, GPIO.IN)
-            logger.debug(f"Motion sensor pin {self.motion_sensor_pin} configured as input")
+            logger.debug("Motion sensor pin %s configured as input", self.motion_sensor_pin)
             
             # Setup servo if enabled
             if self.config.get("ENABLE_SERVO") and self.servo_pin is not None:
                 GPIO.setup(self.servo_pin, GPIO.OUT)
-                logger.debug(f"Servo pin {self.servo_pin} configured as output")
+                # Keep a single PWM channel running; moves only change the duty cycle
+                self._servo_pwm = GPIO.PWM(self.servo_pin, 50)  # 50Hz frequency
+                self._servo_pwm.start(0)
+                logger.debug("Servo pin %s configured as output", self.servo_pin)
             else:
                 logger.debug("Servo functionality disabled")
             
             logger.info("GPIO setup completed successfully")
             
         except Exception as e:
-            logger.error(f"Error during GPIO setup: {str(e)}")
+            logger.error("Error during GPIO setup: %s", e)
             raise
 
     def start_monitoring(self) -> None:
@@ -111,6 +142,9 @@ class HardwareIntegration:
             return
             
         self._stop_monitoring.clear()
+        # Started first so it is created at normal priority
+        self._event_thread = Thread(target=self._dispatch_level_changes, name="hardware-events", daemon=True)
+        self._event_thread.start()
         self._monitor_thread = Thread(target=self._monitor_loop)
         self._monitor_thread.daemon = True
         self._monitor_thread.start()
@@ -120,44 +154,182 @@ class HardwareIntegration:
         """Stop the hardware monitoring thread."""
         if self._monitor_thread:
             self._stop_monitoring.set()
+            self._edge_detected.set()  # Wake the monitor thread so it can exit
             self._monitor_thread.join()
+            # Let the event thread handle the remaining changes, then exit
+            self._level_changes.put(None)
+            self._event_thread.join()
             logger.info("Hardware monitoring stopped")
 
     def _monitor_loop(self) -> None:
-        """Main monitoring loop for hardware events."""
+        """
+        Register edge-triggered callbacks for the input pins and debounce the
+        transitions they report until monitoring is stopped. The thread sleeps
+        until an edge occurs, then samples the inputs at 1 kHz until they settle.
+        """
         logger.debug("Entering hardware monitoring loop")
+        self._set_realtime_priority()
+        
+        # Start each debounce register saturated at the current pin level
+        for pin, value in zip(self._debounce_pins, self._read_inputs()):
+            level = bool(value)
+            self._stable_levels[pin] = level
+            self._shift_registers[pin] = DEBOUNCE_MASK if level else 0
         
-        button_state = GPIO.input(self.button_pin)
-        motion_state = GPIO.input(self.motion_sensor_pin)
+        try:
+            GPIO.add_event_detect(self.button_pin, GPIO.BOTH,
+                                  callback=self._on_edge, bouncetime=50)
+            GPIO.add_event_detect(self.motion_sensor_pin, GPIO.BOTH,
+                                  callback=self._on_edge)
+        except Exception as e:
+            logger.error("Error enabling edge detection: %s", e)
+            return
         
         while not self._stop_monitoring.is_set():
+            self._edge_detected.wait()
+            self._edge_detected.clear()
+            if self._stop_monitoring.is_set():
+                break
             try:
-                # Check button state (active low with pull-up)
-                new_button_state = GPIO.input(self.button_pin)
-                if new_button_state != button_state:
-                    if new_button_state == GPIO.LOW:
-                        self._handle_event("button_press")
-                        # Add state to world model
-                        self.world_model.update_hardware_state("button", "pressed")
-                    else:
-                        self.world_model.update_hardware_state("button", "released")
-                    button_state = new_button_state
-                
-                # Check motion sensor
-                new_motion_state = GPIO.input(self.motion_sensor_pin)
-                if new_motion_state != motion_state:
-                    if new_motion_state == GPIO.HIGH:
-                        self._handle_event("motion_detected")
-                        self.world_model.update_hardware_state("motion_sensor", "active")
-                    else:
-                        self.world_model.update_hardware_state("motion_sensor", "inactive")
-                    motion_state = new_motion_state
-                
-                time.sleep(0.1)  # Prevent CPU overuse
-                
+                self._debounce_inputs()
             except Exception as e:
-                logger.error(f"Error in monitoring loop: {str(e)}")
-                time.sleep(1)  # Delay before retry
+                logger.error("Error in monitoring loop: %s", e)
+        
+        try:
+            GPIO.remove_event_detect(self.button_pin)
+            GPIO.remove_event_detect(self.motion_sensor_pin)
+        except Exception as e:
+            logger.error("Error disabling edge detection: %s", e)
+
+    @staticmethod
+    def _set_realtime_priority() -> None:
+        """
+        Run the calling thread under SCHED_FIFO so edges are handled promptly
+        even when the CPU is busy. Falls back to normal scheduling when the
+        process lacks permission or the platform has no real-time scheduler.
+        """
+        try:
+            os.sched_setscheduler(0, os.SCHED_FIFO, os.sched_param(MONITOR_THREAD_PRIORITY))
+            logger.debug("Monitor thread running with SCHED_FIFO priority %s", MONITOR_THREAD_PRIORITY)
+        except (PermissionError, AttributeError, OSError) as e:
+            logger.debug("Real-time scheduling unavailable, using default priority: %s", e)
+
+    def _on_edge(self, channel: int) -> None:
+        """
+        Wake the monitor thread to debounce an input transition.
+        
+        Args:
+            channel (int): Pin that changed state
+        """
+        self._edge_detected.set()
+
+    def _debounce_inputs(self) -> None:
+        """
+        Sample the input pins into 32-bit shift registers until every pin has
+        read the same level for 32 consecutive samples, reporting each settled
+        level change. Contact bounce never saturates a register, so it is ignored.
+        Returns early when monitoring is stopped, so a floating or chattering
+        input can't keep the thread here forever.
+        """
+        while not self._stop_monitoring.is_set():
+            settled = True
+            for pin, value in zip(self._debounce_pins, self._read_inputs()):
+                shift = ((self._shift_registers[pin] << 1) | bool(value)) & DEBOUNCE_MASK
+                self._shift_registers[pin] = shift
+                if shift == 0 or shift == DEBOUNCE_MASK:
+                    level = shift != 0
+                    if level != self._stable_levels[pin]:
+                        self._stable_levels[pin] = level
+                        self._level_changes.put((pin, level))
+                else:
+                    settled = False
+            
+            if settled:
+                return
+            time.sleep(DEBOUNCE_SAMPLE_INTERVAL)
+
+    def _read_inputs(self) -> List[int]:
+        """
+        Read every debounced input pin, in a single call when the GPIO backend
+        supports bulk reads.
+        
+        Returns:
+            List[int]: Pin levels in the order of self._debounce_pins
+        """
+        if self._input_many is not None:
+            return self._input_many(self._debounce_pins)
+        return [GPIO.input(pin) for pin in self._debounce_pins]
+
+    def _dispatch_level_changes(self) -> None:
+        """
+        Handle debounced level changes queued by the monitor thread. Runs at
+        normal priority so callbacks, logging and anything they start (such
+        as timers) never inherit the monitor thread's real-time scheduling.
+        Exits when a None sentinel is received.
+        """
+        while True:
+            change = self._level_changes.get()
+            if change is None:
+                return
+            try:
+                self._on_level_change(*change)
+            except Exception as e:
+                logger.error("Error handling input change: %s", e)
+
+    def _on_level_change(self, pin: int, level: bool) -> None:
+        """
+        Handle a debounced input level change.
+        
+        Args:
+            pin (int): Pin whose level changed
+            level (bool): New level (True for high)
+        """
+        if pin == self.button_pin:
+            # Active low with pull-up
+            if not level:
+                self._handle_event("button_press")
+                # Add state to world model
+                self._queue_state("button", "pressed")
+            else:
+                self._queue_state("button", "released")
+        elif pin == self.motion_sensor_pin:
+            if level:
+                self._handle_event("motion_detected")
+                self._queue_state("motion_sensor", "active")
+            else:
+                self._queue_state("motion_sensor", "inactive")
+
+    def _queue_state(self, component: str, state: Any) -> None:
+        """Queue a hardware state update for the world model."""
+        self._update_queue.put(("hardware_state", component, state))
+
+    def _queue_event(self, description: str) -> None:
+        """Queue a hardware event for the world model."""
+        self._update_queue.put(("hardware_event", description, None))
+
+    def _apply_updates(self) -> None:
+        """
+        Apply queued world model updates, taking everything queued since the
+        last batch at once. Exits when a None sentinel is received.
+        """
+        while True:
+            batch = [self._update_queue.get()]
+            try:
+                while True:
+                    batch.append(self._update_queue.get_nowait())
+            except Empty:
+                pass
+            
+            stop = None in batch
+            if stop:
+                batch = [update for update in batch if update is not None]
+            if batch:
+                try:
+                    self.world_model.apply_batch(batch)
+                except Exception as e:
+                    logger.error("Error applying world model updates: %s", e)
+            if stop:
+                return
 
     def _handle_event(self, event_type: str) -> None:
         """
@@ -170,14 +342,14 @@ class HardwareIntegration:
         logger.debug(event_description)
         
         # Update world model
-        self.world_model.update_hardware_event(event_description)
+        self._queue_event(event_description)
         
         # Trigger any registered callbacks
         if event_type in self.event_callbacks:
             try:
                 self.event_callbacks[event_type]()
             except Exception as e:
-                logger.error(f"Error in event callback: {str(e)}")
+                logger.error("Error in event callback: %s", e)
 
     def register_callback(self, event_type: str, callback: Callable) -> None:
         """
@@ -188,7 +360,7 @@ class HardwareIntegration:
             callback (Callable): Function to call when event occurs
         """
         self.event_callbacks[event_type] = callback
-        logger.debug(f"Registered callback for {event_type}")
+        logger.debug("Registered callback for %s", event_type)
 
     def set_led(self, state: bool) -> None:
         """
@@ -200,12 +372,12 @@ class HardwareIntegration:
         try:
             GPIO.output(self.led_pin, GPIO.HIGH if state else GPIO.LOW)
             # Update world model with LED state
-            self.world_model.update_hardware_state("led", "on" if state else "off")
+            self._queue_state("led", "on" if state else "off")
             event_desc = f"LED turned {'on' if state else 'off'}"
-            self.world_model.update_hardware_event(event_desc)
+            self._queue_event(event_desc)
             logger.debug(event_desc)
         except Exception as e:
-            logger.error(f"Error controlling LED: {str(e)}")
+            logger.error("Error controlling LED: %s", e)
 
     def control_servo(self, angle: float) -> None:
         """
@@ -214,41 +386,38 @@ class HardwareIntegration:
         Args:
             angle (float): Desired angle in degrees (0-180)
         """
-        if not self.config.get("ENABLE_SERVO") or self.servo_pin is None:
+        if self._servo_pwm is None:
             logger.debug("Servo control skipped - servo not enabled")
             return
             
         try:
             # Convert angle to duty cycle (example conversion)
-            duty_cycle = 2.5 + (angle / 180.0) * 10.0
-            
-            # Configure PWM
-            pwm = GPIO.PWM(self.servo_pin, 50)  # 50Hz frequency
-            pwm.start(duty_cycle)
-            
-            # Hold position briefly
-            time.sleep(0.5)
-            
-            # Cleanup
-            pwm.stop()
+            duty_cycle = 2.5 + angle / 18.0
+            self._servo_pwm.ChangeDutyCycle(duty_cycle)
             
             # Update world model with servo state
-            self.world_model.update_hardware_state("servo", angle)
+            self._queue_state("servo", angle)
             event_desc = f"Servo rotated to {angle} degrees"
-            self.world_model.update_hardware_event(event_desc)
+            self._queue_event(event_desc)
             logger.debug(event_desc)
             
         except Exception as e:
-            logger.error(f"Error controlling servo: {str(e)}")
+            logger.error("Error controlling servo: %s", e)
 
     def cleanup(self) -> None:
         """Cleanup GPIO resources."""
         try:
             self.stop_monitoring()
+            if self._servo_pwm is not None:
+                self._servo_pwm.stop()
+                self._servo_pwm = None
+            # Flush pending world model updates
+            self._update_queue.put(None)
+            self._update_thread.join()
             GPIO.cleanup()
             logger.info("Hardware resources cleaned up")
         except Exception as e:
-            logger.error(f"Error during cleanup: {str(e)}")
+            logger.error("Error during cleanup: %s", e)
 
 def main():
     """Example usage of HardwareIntegration class."""
@@ -3,11 +3,15 @@ Main entry point for the AI Assistant project.
 Handles initialization, event loop, and shutdown procedures.
 """
 
+import asyncio
+import atexit
 import logging
+import logging.handlers
+import re
 import signal
 import sys
-import time
-from typing import Optional
+import threading
+from typing import AsyncIterator, Optional
 
 # Append system root to path
 import os
@@ -16,6 +20,7 @@ sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 # Internal modules
 from src.config import load_config, get_pin_config
 from src.data.world_model import WorldModel
+from src.hardware.gpio import GPIO
 from src.hardware.hardware_integration import HardwareIntegration
 
 # These will be created later
@@ -24,19 +29,33 @@ from src.data.chat_handler_world import ChatHandlerWorld
 # from hologram_display import HologramDisplay  # Future feature
 # from gesture_recognition import GestureRecognizer  # Future feature
 
-# Configure logging
+# Configure logging; the log file is only written in development builds
+# (production runs with python -O, which disables __debug__). File records
+# are buffered in memory and written in batches, or at once on errors.
+_log_handlers = [logging.StreamHandler()]
+if __debug__:
+    _memory_handler = logging.handlers.MemoryHandler(
+        512, flushLevel=logging.ERROR, target=logging.FileHandler('ai_assistant.log')
+    )
+    atexit.register(_memory_handler.flush)
+    _log_handlers.append(_memory_handler)
+
 logging.basicConfig(
     level=logging.INFO,
     format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-    handlers=[
-        logging.StreamHandler(),
-        logging.FileHandler('ai_assistant.log')
-    ]
+    handlers=_log_handlers
 )
 
 logger = logging.getLogger(__name__)
 logger.info("Starting AI Assistant application")
 
+# Splits streamed text after sentence-ending punctuation
+SENTENCE_END_RE = re.compile(r"(?<=[.!?])\s+")
+
+# Backoff between attempts to recover a failed microphone stream (seconds)
+MIC_RETRY_MIN_DELAY = 0.5
+MIC_RETRY_MAX_DELAY = 30.0
+
 class AIAssistant:
     """Main AI Assistant class that coordinates all components."""
     
@@ -49,6 +68,13 @@ class AIAssistant:
         logger.debug("Pin configuration loaded")
         self.running = False
         
+        # Activation plumbing, created when the main loop starts
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._activation_q: Optional[asyncio.Queue] = None
+        self._wake_word_enabled: Optional[asyncio.Event] = None
+        self._mic_lock = threading.Lock()
+        self._warmup_task: Optional[asyncio.Task] = None
+        
         # Add WorldModel initialization
         self.world_model = WorldModel()
         logger.debug("World model initialized")
@@ -61,7 +87,7 @@ class AIAssistant:
         try:
             self._init_components()
         except Exception as e:
-            logger.error(f"Failed to initialize components: {e}")
+            logger.error("Failed to initialize components: %s", e)
             raise
 
     def _init_components(self):
@@ -73,12 +99,19 @@ class AIAssistant:
         self.speech_recognizer = SpeechRecognizer(
             language=self.config["STT_LANGUAGE"],
             timeout=self.config["STT_TIMEOUT"],
-            phrase_timeout=self.config["STT_PHRASE_TIMEOUT"]
+            phrase_timeout=self.config["STT_PHRASE_TIMEOUT"],
+            model_size=self.config["STT_MODEL"],
+            vad_model_path=self.config["VAD_MODEL_PATH"],
+            porcupine_access_key=self.config["PICOVOICE_ACCESS_KEY"],
+            porcupine_keyword_path=self.config["PORCUPINE_KEYWORD_PATH"],
+            wake_words=self.config["WAKE_WORDS"],
+            wake_word_model=self.config["WAKE_WORD_MODEL"],
+            wake_word_threshold=self.config["WAKE_WORD_THRESHOLD"]
         )
         
         logger.debug("Initializing text-to-speech engine")
         self.tts_engine = TextToSpeech(
-            voice_id=self.config["TTS_VOICE_ID"],
+            voice_model=self.config["TTS_VOICE_MODEL"],
             rate=self.config["TTS_RATE"],
             volume=self.config["TTS_VOLUME"]
         )
@@ -103,84 +136,136 @@ class AIAssistant:
         logger.info("All components initialized successfully")
 
     def _init_hardware(self):
-        """Initialize hardware components (LED, button, sensors)."""
-        try:
-            try:
-                import RPi.GPIO as GPIO
-                logger.debug("Using RPi.GPIO")
-            except ImportError:
-                from gpio_wrapper import GPIO
-                logger.debug("Using GPIO wrapper")
-            GPIO.setmode(GPIO.BCM)
-            
-            # Setup LED
-            logger.debug(f"Setting up LED on pin {self.pin_config['LED_PIN']}")
-            GPIO.setup(self.pin_config["LED_PIN"], GPIO.OUT)
-            
-            # Setup button with pull-up resistor
-            logger.debug(f"Setting up button on pin {self.pin_config['BUTTON_PIN']}")
-            GPIO.setup(self.pin_config["BUTTON_PIN"], GPIO.IN, pull_up_down=GPIO.PUD_UP)
-            
-            # Setup motion sensor
-            logger.debug(f"Setting up motion sensor on pin {self.pin_config['MOTION_SENSOR_PIN']}")
-            GPIO.setup(self.pin_config["MOTION_SENSOR_PIN"], GPIO.IN)
-            
-            # Setup servo if enabled
-            if self.config.get("ENABLE_SERVO") and self.pin_config.get("SERVO_PIN"):
-                logger.debug(f"Setting up servo on pin {self.pin_config['SERVO_PIN']}")
-                GPIO.setup(self.pin_config["SERVO_PIN"], GPIO.OUT)
-            else:
-                logger.debug("Servo functionality disabled")
-            
-            logger.info("Hardware components initialized successfully")
-        except Exception as e:
-            logger.error(f"Failed to initialize hardware: {e}")
-            raise
+        """
+        Bind the hardware handles used during interactions. The pins are
+        configured by HardwareIntegration, which also watches the button and
+        motion sensor with edge-triggered callbacks, so nothing is set up or
+        polled here.
+        """
+        self._led_pin = self.pin_config["LED_PIN"]
+        logger.info("Hardware components initialized successfully")
 
-    async def start(self):
-        """Start the AI Assistant's main loop."""
+    async def run(self):
+        """
+        Run the AI Assistant's main loop.
+        Wake word detection and interaction handling run as concurrent
+        coroutines. Wake words and button presses (from hardware callbacks)
+        both post to an activation queue, so the loop sleeps until there is
+        something to do.
+        """
         self.running = True
         logger.info("AI Assistant starting...")
+        self._loop = asyncio.get_running_loop()
+        self._activation_q = asyncio.Queue()
+        self._wake_word_enabled = asyncio.Event()
+        
+        # Ctrl+C and SIGTERM ask the loops to finish so the cleanup below runs
+        for sig in (signal.SIGINT, signal.SIGTERM):
+            try:
+                self._loop.add_signal_handler(sig, self.stop)
+            except NotImplementedError:
+                # No loop signal handlers on Windows; asyncio.run's Ctrl+C
+                # handling cancels the loops instead
+                pass
+        
+        # Connect to the API in the background so the first turn skips the TLS handshake
+        self._warmup_task = asyncio.create_task(self.chat_handler.warmup())
         
         # Welcome message
         self.tts_engine.speak("AI Assistant is now online and ready.")
         
+        self._wake_word_enabled.set()
+        loops = [asyncio.create_task(self._wake_loop()), asyncio.create_task(self._main_loop())]
         try:
-            while self.running:
-                if self._check_activation():
-                    await self._handle_interaction()
-                time.sleep(0.1)  # Prevent CPU overuse
-                
-        except KeyboardInterrupt:
-            logger.info("Keyboard interrupt received")
-            self.shutdown()
+            await asyncio.gather(*loops)
         except Exception as e:
-            logger.error(f"Error in main loop: {e}")
-            self.shutdown()
+            logger.error("Error in main loop: %s", e)
+        finally:
+            # Make sure neither loop is still running before the components go away
+            self.stop()
+            for task in loops:
+                task.cancel()
+            await asyncio.gather(*loops, return_exceptions=True)
+            
+            # Warmup may still be using the HTTP client that aclose() shuts down
+            self._warmup_task.cancel()
+            await asyncio.gather(self._warmup_task, return_exceptions=True)
+            
+            # Release everything on the loop so the API client closes cleanly
+            self._release_components()
+            await self.chat_handler.aclose()
+            logger.info("Shutdown complete")
 
-    def _check_activation(self) -> bool:
+    async def _wake_loop(self):
         """
-        Check if the assistant should be activated.
-        
-        Returns:
-            bool: True if activation criteria are met, False otherwise.
+        Listen for the wake word in the executor and post activations. If the
+        microphone fails, the stream is reopened with exponential backoff.
         """
-        # Check for wake word
-        if self.speech_recognizer.detect_wake_word("wunderkind"):
-            logger.info("Wake word detected")
-            return True
-        
-        # Check for button press
-        try:
-            import RPi.GPIO as GPIO
-            if not GPIO.input(self.pin_config["BUTTON_PIN"]):
-                logger.info("Button press detected")
-                return True
-        except ImportError:
-            logger.debug("GPIO import failed, skipping button check")
-            pass
+        retry_delay = MIC_RETRY_MIN_DELAY
+        while self.running:
+            await self._wake_word_enabled.wait()
+            if not self.running:
+                break
+            try:
+                detected = await self._loop.run_in_executor(None, self._detect_wake_word)
+            except Exception as e:
+                logger.warning("Microphone error, retrying in %.1fs: %s", retry_delay, e)
+                await asyncio.sleep(retry_delay)
+                retry_delay = min(retry_delay * 2, MIC_RETRY_MAX_DELAY)
+                try:
+                    await self._loop.run_in_executor(None, self._reopen_microphone)
+                except Exception as e:
+                    logger.warning("Failed to reopen microphone: %s", e)
+                continue
+            retry_delay = MIC_RETRY_MIN_DELAY
+            # An activation may have started while the frame was being checked
+            if detected and self._wake_word_enabled.is_set():
+                logger.info("Wake word detected")
+                self._wake_word_enabled.clear()
+                self._activation_q.put_nowait("wake_word")
+
+    async def _main_loop(self):
+        """Handle activations one interaction at a time."""
+        while self.running:
+            source = await self._activation_q.get()
+            if source is None:
+                break
+            logger.info("Activated by %s", source)
+            
+            # Stop wake word detection so listen() has the microphone to itself
+            self._wake_word_enabled.clear()
+            try:
+                await self._handle_interaction()
+            finally:
+                # Ignore activations that arrived mid-interaction
+                while not self._activation_q.empty():
+                    self._activation_q.get_nowait()
+                self._wake_word_enabled.set()
+
+    def _detect_wake_word(self) -> bool:
+        """Check for the wake word while holding the microphone."""
+        with self._mic_lock:
+            return self.speech_recognizer.detect_wake_word()
+
+    def _reopen_microphone(self):
+        """Reopen the microphone stream while holding the microphone."""
+        with self._mic_lock:
+            self.speech_recognizer.reopen_stream()
+
+    def _activate(self, source: str):
+        """
+        Post an activation to the main loop; safe to call from any thread.
         
-        return False
+        Args:
+            source (str): What triggered the activation
+        """
+        if self._loop is not None:
+            self._loop.call_soon_threadsafe(self._activation_q.put_nowait, source)
+
+    def _listen(self) -> Optional[str]:
+        """Listen for user input while holding the microphone."""
+        with self._mic_lock:
+            return self.speech_recognizer.listen()
 
     async def _handle_interaction(self):
         """Handle a single interaction with the user."""
@@ -188,15 +273,15 @@ class AIAssistant:
         logger.debug("Setting LED on")
         self._set_led(True)
         
-        # Get user input
+        # Get user input without blocking the event loop
         logger.debug("Listening for user input")
-        user_input = self.speech_recognizer.listen()
+        user_input = await self._loop.run_in_executor(None, self._listen)
         if not user_input:
             logger.debug("No user input received")
             self._set_led(False)
             return
         
-        logger.info(f"User said: {user_input}")
+        logger.info("User said: %s", user_input)
         
         # Add the interaction to world model
         self.world_model.add_fact(f"User said: {user_input}")
@@ -205,21 +290,15 @@ class AIAssistant:
         if "shutdown" in user_input.lower():
             logger.info("Shutdown command received")
             self.tts_engine.speak("Shutting down. Goodbye!")
-            self.shutdown()
+            self.stop()
+            self._set_led(False)
             return
         
-        # Get world model summary to provide context
-        context = self.world_model.get_summary()
-        
-        # Process the input and get response with context
-        logger.debug("Generating response")
-        response = await self.chat_handler.generate_response(
-            f"Context:\n{context}\n\nUser input: {user_input}"
-        )
-        
-        # Speak the response
-        logger.debug("Speaking response")
-        self.tts_engine.speak(response)
+        # Process the input, speaking each sentence as it arrives. The chat
+        # handler adds the world model summary to the request itself, so the
+        # prompt is just the utterance and repeated questions can be cached.
+        logger.debug("Streaming response")
+        response = await self._speak_streamed(self.chat_handler.stream_response(user_input))
         
         # Add the response to world model
         self.world_model.add_fact(f"Assistant responded: {response}")
@@ -228,68 +307,89 @@ class AIAssistant:
         logger.debug("Setting LED off")
         self._set_led(False)
 
+    async def _speak_streamed(self, chunks: AsyncIterator[str]) -> str:
+        """
+        Speak a streamed response sentence by sentence while it is generated.
+        
+        Args:
+            chunks (AsyncIterator[str]): Streamed response text
+            
+        Returns:
+            str: The complete response text
+        """
+        # Each sentence is queued on the TTS worker as soon as it is complete;
+        # playback overlaps generation and is awaited once at the end
+        spoken = []
+        parts = []
+        pending = ""
+        try:
+            async for chunk in chunks:
+                parts.append(chunk)
+                *complete, pending = SENTENCE_END_RE.split(pending + chunk)
+                for sentence in complete:
+                    if sentence.strip():
+                        spoken.append(asyncio.ensure_future(self.tts_engine.speak_async(sentence.strip())))
+            if pending.strip():
+                spoken.append(asyncio.ensure_future(self.tts_engine.speak_async(pending.strip())))
+        finally:
+            if spoken:
+                await asyncio.gather(*spoken)
+        
+        return "".join(parts).strip()
+
     def _set_led(self, state: bool):
         """Set the LED state."""
-        try:
-            import RPi.GPIO as GPIO
-            GPIO.output(self.pin_config["LED_PIN"], state)
-            logger.debug(f"LED set to {state}")
-        except ImportError:
-            logger.debug("GPIO import failed, skipping LED control")
-            pass
+        GPIO.output(self._led_pin, state)
+        logger.debug("LED set to %s", state)
 
-    def shutdown(self):
-        """Perform a clean shutdown of the AI Assistant."""
+    def stop(self):
+        """Ask the main loop to finish; run() releases the components on exit."""
+        if not self.running:
+            return
         logger.info("Shutting down AI Assistant...")
         self.running = False
-        
-        # Cleanup hardware
-        try:
-            import RPi.GPIO as GPIO
-            GPIO.cleanup()
-            logger.debug("GPIO cleanup completed")
-        except ImportError:
-            logger.debug("GPIO import failed, skipping cleanup")
-            pass
+        if self._wake_word_enabled is not None:
+            self._wake_word_enabled.set()  # Let the wake loop exit
+        if self._activation_q is not None:
+            self._activation_q.put_nowait(None)  # Wake the main loop
+
+    def _release_components(self):
+        """Release hardware and speech resources."""
+        # Cleanup hardware first: it stops the monitor thread and servo
+        # before releasing the GPIO lines itself
+        if hasattr(self, 'hardware'):
+            self.hardware.cleanup()
         
         # Cleanup other components
         logger.debug("Cleaning up components")
-        self.speech_recognizer.cleanup()
+        # A cancelled wake word check may still be reading in the executor,
+        # so wait for it to let go of the microphone before closing the stream
+        with self._mic_lock:
+            self.speech_recognizer.cleanup()
         self.tts_engine.cleanup()
-        self.chat_handler.cleanup()
-        
-        if hasattr(self, 'hardware'):
-            self.hardware.cleanup()
-        
-        logger.info("Shutdown complete")
-        sys.exit(0)
 
     def _handle_button_press(self):
         """Handle button press events."""
         logger.info("Button press detected")
-        self.hardware.set_led(True)  # Visual feedback
-        # Additional button press handling logic
-        self.hardware.set_led(False)
+        self._activate("button")
 
     def _handle_motion_detected(self):
         """Handle motion detection events."""
         logger.info("Motion detected")
         self.hardware.set_led(True)
-        time.sleep(0.5)
-        self.hardware.set_led(False)
+        # Turn the LED off later rather than sleeping on the hardware monitor thread
+        led_off = threading.Timer(self.config["LED_FEEDBACK_DURATION"], self.hardware.set_led, args=(False,))
+        led_off.daemon = True
+        led_off.start()
 
 def main():
     """Main entry point for the AI Assistant."""
     logger.info("Starting main function")
-    # Setup signal handlers
-    signal.signal(signal.SIGINT, lambda sig, frame: None)  # Handle Ctrl+C gracefully
-    logger.debug("Signal handlers configured")
-    
     try:
         assistant = AIAssistant()
-        assistant.start()
+        asyncio.run(assistant.run())
     except Exception as e:
-        logger.error(f"Fatal error: {e}")
+        logger.error("Fatal error: %s", e)
         sys.exit(1)
 
 if __name__ == "__main__":
@@ -1,12 +1,41 @@
 """
 Speech handling module for the AI Assistant project.
-Provides text-to-speech and speech-to-text functionality using pyttsx3 and SpeechRecognition.
+Provides text-to-speech and speech-to-text functionality using Piper,
+SpeechRecognition and a local faster-whisper model.
 """
 
+import asyncio
+import re
+import threading
+import time
 import speech_recognition as sr
-import pyttsx3
-from typing import Optional, Tuple
+import ctranslate2
+import numpy as np
+import onnxruntime as ort
+import sounddevice as sd
+from faster_whisper import WhisperModel
+from piper.voice import PiperVoice
+from collections import deque
+from concurrent.futures import Future
+from queue import SimpleQueue
+from typing import Optional, Sequence, Tuple
+import atexit
 import logging
+import logging.handlers
+
+# Porcupine is optional; without it wake words are recognized via STT
+try:
+    import pvporcupine
+except ImportError:
+    pvporcupine = None
+
+# openWakeWord with a WebRTC VAD gate is optional too
+try:
+    import webrtcvad
+    from openwakeword.model import Model as WakeWordModel
+except ImportError:
+    webrtcvad = None
+    WakeWordModel = None
 
 # Configure logging
 logger = logging.getLogger(__name__)
@@ -30,12 +59,48 @@ file_handler.setFormatter(file_formatter)
 
 # Add handlers to logger
 logger.addHandler(console_handler)
-logger.addHandler(file_handler)
+# Buffer file records in memory and write them in batches, or at once on errors
+buffered_file_handler = logging.handlers.MemoryHandler(256, flushLevel=logging.ERROR, target=file_handler)
+atexit.register(buffered_file_handler.flush)
+logger.addHandler(buffered_file_handler)
+
+# Audio capture settings for local transcription
+SAMPLE_RATE = 16000        # Hz, as expected by Whisper
+MAX_PHRASE_SECONDS = 30    # Upper bound on a single recorded phrase
+NOISE_RECALIBRATE_SECONDS = 60  # Age after which the noise floor is refreshed
+NOISE_DRIFT_RATIO = 0.25        # Relative threshold change that triggers an early refresh
+NOISE_EMA_ALPHA = 0.02          # Weight of each non-speech frame in the ambient estimate
+NOISE_MIN_FRAMES = 30           # Non-speech frames needed before refreshing from them
+
+# Silero VAD settings used to gate wake word recognition
+VAD_FRAME_SAMPLES = 512    # 32 ms frames
+VAD_CONTEXT_SAMPLES = 64   # Trailing samples of the previous frame fed to the model
+VAD_THRESHOLD = 0.5        # Speech probability above which a frame counts as speech
+VAD_ONSET_FRAMES = 3       # Consecutive speech frames required to start recognition
+WAKE_WORD_MAX_SECONDS = 3  # Upper bound on audio sent for wake word recognition
+
+# Wake words used when none are configured
+DEFAULT_WAKE_WORDS = ("wunderkind",)
+
+# openWakeWord settings
+OWW_FRAME_SAMPLES = 1280   # 80 ms frames, as expected by openWakeWord
+OWW_VAD_SAMPLES = 320      # 20 ms sub-frames checked by the WebRTC VAD
+OWW_VAD_MODE = 3           # Most aggressive WebRTC VAD filtering
+
+# Text-to-speech settings
+TTS_BASE_RATE = 150           # words per minute at Piper's default length scale
+TTS_DRAIN_TIMEOUT = 10        # seconds to wait for queued speech on cleanup
 
 class SpeechRecognizer:
     """Handles speech-to-text operations."""
     
-    def __init__(self, language: str = "en-US", timeout: int = 5, phrase_timeout: float = 1.5):
+    def __init__(self, language: str = "en-US", timeout: int = 5, phrase_timeout: float = 1.5,
+                 model_size: str = "small", vad_model_path: str = "silero_vad.onnx",
+                 porcupine_access_key: Optional[str] = None,
+                 porcupine_keyword_path: Optional[str] = None,
+                 wake_words: Sequence[str] = DEFAULT_WAKE_WORDS,
+                 wake_word_model: Optional[str] = None,
+                 wake_word_threshold: float = 0.5):
         """
         Initialize speech recognizer.
         
@@ -43,15 +108,80 @@ class SpeechRecognizer:
             language (str): Language code for recognition
             timeout (int): Maximum time to listen for
             phrase_timeout (float): Timeout for phrase completion
+            model_size (str): faster-whisper model to use for transcription
+            vad_model_path (str): Path to the Silero VAD ONNX model
+            porcupine_access_key (str, optional): Picovoice access key
+            porcupine_keyword_path (str, optional): Porcupine keyword model (.ppn) for the wake word
+            wake_words (Sequence[str]): Wake words matched in transcriptions when
+                no keyword spotter is configured
+            wake_word_model (str, optional): openWakeWord model (.onnx) for the wake word
+            wake_word_threshold (float): openWakeWord score that counts as a detection
         """
         self.language = language
         self.timeout = timeout
+        self.phrase_timeout = phrase_timeout
         
-        # Initialize speech recognition
+        # Initialize speech recognition (used for wake word detection)
         self.recognizer = sr.Recognizer()
         self.recognizer.pause_threshold = phrase_timeout
         self.recognizer.operation_timeout = timeout
-        logger.info("Initialized SpeechRecognizer")
+        
+        # An empty alternation would match any word, so every utterance
+        # would wake the assistant
+        wake_words = [word.strip() for word in wake_words if word.strip()]
+        if not wake_words:
+            logger.warning("No wake words configured, using %s", ", ".join(DEFAULT_WAKE_WORDS))
+            wake_words = DEFAULT_WAKE_WORDS
+        
+        # All wake words are matched as whole words in a single scan
+        self._wake_re = re.compile(
+            r"\b(?:" + "|".join(re.escape(word) for word in wake_words) + r")\b",
+            re.IGNORECASE
+        )
+        
+        # Local Whisper model: INT8 on CPU, INT8/FP16 on CUDA when available
+        if ctranslate2.get_cuda_device_count() > 0:
+            device, compute_type = "cuda", "int8_float16"
+        else:
+            device, compute_type = "cpu", "int8"
+        self.model = WhisperModel(model_size, device=device, compute_type=compute_type)
+        
+        # Silero VAD, so silence never reaches a recognizer
+        self.vad_session = ort.InferenceSession(vad_model_path, providers=["CPUExecutionProvider"])
+        self._vad_state = np.zeros((2, 1, 128), dtype=np.float32)
+        self._vad_context = np.zeros(VAD_CONTEXT_SAMPLES, dtype=np.float32)
+        self._vad_rate = np.array(SAMPLE_RATE, dtype=np.int64)
+        self._onset_frames: deque = deque(maxlen=VAD_ONSET_FRAMES)
+        
+        # One persistent microphone stream shared by wake word detection and listen()
+        self._stream = self._open_stream()
+        
+        # Calibrate the speech energy threshold once. Afterwards the ambient level
+        # is tracked from frames the VAD rejects and the threshold refreshed from it
+        logger.debug("Adjusting for ambient noise...")
+        self._ambient_rms = self._measure_noise_floor()
+        self._ambient_frames = 0
+        self._energy_threshold = self._threshold_for(self._ambient_rms)
+        self._calibrated_at = time.monotonic()
+        
+        # On-device keyword spotter, fed 512-sample frames from the same stream
+        self.porcupine = None
+        if pvporcupine and porcupine_access_key and porcupine_keyword_path:
+            self.porcupine = pvporcupine.create(
+                access_key=porcupine_access_key,
+                keyword_paths=[porcupine_keyword_path]
+            )
+            logger.info("Using Porcupine for wake word detection")
+        
+        # Otherwise an openWakeWord model, run only on audio the WebRTC VAD accepts
+        self.wake_word_model = None
+        self.wake_word_threshold = wake_word_threshold
+        if self.porcupine is None and WakeWordModel and wake_word_model:
+            self.wake_word_model = WakeWordModel(wakeword_models=[wake_word_model],
+                                                 inference_framework="onnx")
+            self._webrtc_vad = webrtcvad.Vad(OWW_VAD_MODE)
+            logger.info("Using openWakeWord for wake word detection")
+        logger.info("Initialized SpeechRecognizer with Whisper '%s' on %s", model_size, device)
 
     def listen(self) -> Optional[str]:
         """
@@ -61,91 +191,407 @@ class SpeechRecognizer:
             Optional[str]: Transcribed text or None if failed
         """
         try:
-            with sr.Microphone() as source:
-                logger.debug("Adjusting for ambient noise...")
-                self.recognizer.adjust_for_ambient_noise(source, duration=1)
-                
-                logger.debug("Listening for speech...")
-                audio = self.recognizer.listen(source, timeout=self.timeout)
-                
-                logger.debug("Processing speech...")
-                text = self.recognizer.recognize_google(
-                    audio,
-                    language=self.language
-                )
-                logger.info(f"Successfully transcribed: '{text}'")
-                return text.lower()
-
-        except sr.WaitTimeoutError:
-            logger.warning("Listening timed out")
-        except sr.UnknownValueError:
-            logger.warning("Could not understand audio")
-        except sr.RequestError as e:
-            logger.error(f"Could not request results: {str(e)}")
+            logger.debug("Listening for speech...")
+            audio = self._record_phrase(self._energy_threshold)
+            if audio is None:
+                logger.warning("Listening timed out")
+                return None
+            
+            logger.debug("Processing speech...")
+            segments, _ = self.model.transcribe(
+                audio,
+                language=self.language.split("-")[0],
+                vad_filter=True,
+                beam_size=1
+            )
+            text = " ".join(segment.text.strip() for segment in segments).strip()
+            if not text:
+                logger.warning("Could not understand audio")
+                return None
+            
+            logger.info("Successfully transcribed: '%s'", text)
+            return text.lower()
+
         except Exception as e:
-            logger.error(f"Unexpected error in listen(): {str(e)}")
+            logger.error("Unexpected error in listen(): %s", e)
         
         return None
 
-    def detect_wake_word(self, wake_word: str = "hey wunderkind") -> bool:
+    @staticmethod
+    def _open_stream() -> sd.RawInputStream:
         """
-        Check for wake word in audio stream.
+        Open and start the microphone stream.
+        
+        Returns:
+            sd.RawInputStream: Running 16 kHz mono input stream
+        """
+        stream = sd.RawInputStream(samplerate=SAMPLE_RATE, blocksize=VAD_FRAME_SAMPLES,
+                                   dtype="int16", channels=1)
+        stream.start()
+        return stream
+
+    def reopen_stream(self) -> None:
+        """
+        Replace the microphone stream after it has failed, e.g. because the
+        device was unplugged.
+        
+        Raises:
+            sd.PortAudioError: If the microphone can't be opened
+        """
+        try:
+            self._stream.close()
+        except sd.PortAudioError as e:
+            logger.debug("Error closing failed microphone stream: %s", e)
+        self._stream = self._open_stream()
+        self._onset_frames.clear()
+        logger.info("Microphone stream reopened")
+
+    @staticmethod
+    def _read_frame(stream: sd.RawInputStream) -> np.ndarray:
+        """
+        Read one frame of 16-bit mono audio from the stream.
         
         Args:
-            wake_word (str): Wake word to detect
+            stream (sd.RawInputStream): Open input stream
             
+        Returns:
+            np.ndarray: Frame samples as int16
+        """
+        data, _ = stream.read(stream.blocksize)
+        return np.frombuffer(data, dtype=np.int16)
+
+    @staticmethod
+    def _rms(frame: np.ndarray) -> float:
+        """Return the root-mean-square energy of an audio frame."""
+        return float(np.sqrt(np.mean(frame.astype(np.float32) ** 2)))
+
+    def _measure_noise_floor(self, duration: float = 1.0) -> float:
+        """
+        Measure ambient noise to derive the speech energy threshold.
+        
+        Args:
+            duration (float): Seconds of audio to sample
+            
+        Returns:
+            float: Mean RMS energy of the ambient audio
+        """
+        frame_count = max(1, int(duration * SAMPLE_RATE / VAD_FRAME_SAMPLES))
+        return float(np.mean([self._rms(self._read_frame(self._stream)) for _ in range(frame_count)]))
+
+    def _threshold_for(self, ambient: float) -> float:
+        """Return the speech energy threshold for an ambient noise level."""
+        return max(ambient * 1.5, self.recognizer.energy_threshold)
+
+    def _observe_ambient(self, frame: np.ndarray) -> None:
+        """Fold a frame the VAD classified as non-speech into the ambient estimate."""
+        self._ambient_rms += NOISE_EMA_ALPHA * (self._rms(frame) - self._ambient_rms)
+        self._ambient_frames += 1
+
+    def _refresh_noise_floor(self) -> None:
+        """
+        Refresh the speech energy threshold when it is stale or the ambient
+        level has drifted. The VAD path refreshes from the non-speech frames
+        it has already read; only Porcupine, which bypasses the VAD, needs to
+        record a fresh second of audio once the calibration is stale.
+        """
+        now = time.monotonic()
+        stale = now - self._calibrated_at >= NOISE_RECALIBRATE_SECONDS
+        
+        if self._ambient_frames >= NOISE_MIN_FRAMES:
+            threshold = self._threshold_for(self._ambient_rms)
+            drifted = abs(threshold - self._energy_threshold) > NOISE_DRIFT_RATIO * self._energy_threshold
+            if not (stale or drifted):
+                return
+            logger.debug("Updating speech threshold from ambient noise...")
+        elif stale and self.porcupine is not None:
+            logger.debug("Recalibrating for ambient noise...")
+            self._ambient_rms = self._measure_noise_floor()
+            threshold = self._threshold_for(self._ambient_rms)
+        else:
+            return
+        
+        self._energy_threshold = threshold
+        self._ambient_frames = 0
+        self._calibrated_at = now
+
+    def _record_phrase(self, threshold: float) -> Optional[np.ndarray]:
+        """
+        Record a single phrase, ending after phrase_timeout seconds of silence.
+        
+        Args:
+            threshold (float): Energy threshold for speech frames
+            
+        Returns:
+            Optional[np.ndarray]: Float32 audio in [-1, 1], or None if no speech
+            started within the timeout
+        """
+        frame_seconds = VAD_FRAME_SAMPLES / SAMPLE_RATE
+        frames = []
+        previous = None
+        waited = 0.0
+        silence = 0.0
+        
+        while len(frames) * frame_seconds < MAX_PHRASE_SECONDS:
+            frame = self._read_frame(self._stream)
+            is_speech = self._rms(frame) > threshold
+            
+            if not frames:
+                if not is_speech:
+                    waited += frame_seconds
+                    if waited >= self.timeout:
+                        return None
+                    previous = frame
+                    continue
+                # Keep the frame before the onset so the first syllable isn't clipped
+                if previous is not None:
+                    frames.append(previous)
+            
+            frames.append(frame)
+            silence = 0.0 if is_speech else silence + frame_seconds
+            if silence >= self.phrase_timeout:
+                break
+        
+        return np.concatenate(frames).astype(np.float32) / 32768.0
+
+    def _is_speech(self, frame: np.ndarray) -> bool:
+        """
+        Classify a 32 ms frame with the Silero VAD model.
+        
+        Args:
+            frame (np.ndarray): int16 samples of one VAD frame
+            
+        Returns:
+            bool: True if the frame likely contains speech
+        """
+        samples = frame.astype(np.float32) / 32768.0
+        audio = np.concatenate((self._vad_context, samples))[np.newaxis, :]
+        probability, self._vad_state = self.vad_session.run(
+            None, {"input": audio, "state": self._vad_state, "sr": self._vad_rate}
+        )
+        self._vad_context = samples[-VAD_CONTEXT_SAMPLES:]
+        return float(probability[0][0]) > VAD_THRESHOLD
+
+    def _wait_for_speech(self) -> Optional[np.ndarray]:
+        """
+        Read one VAD frame and report whether speech has started.
+        Speech starts once VAD_ONSET_FRAMES consecutive frames are classified
+        as speech; a silent poll costs a single frame read and model call.
+        
+        Returns:
+            Optional[np.ndarray]: int16 audio of the speech onset, or None if
+            no speech has started yet
+        """
+        frame = self._read_frame(self._stream)
+        if not self._is_speech(frame):
+            self._onset_frames.clear()
+            self._observe_ambient(frame)
+            return None
+        
+        self._onset_frames.append(frame)
+        if len(self._onset_frames) < VAD_ONSET_FRAMES:
+            return None
+        
+        onset = np.concatenate(self._onset_frames)
+        self._onset_frames.clear()
+        return onset
+
+    def _capture_utterance(self, onset: np.ndarray) -> np.ndarray:
+        """
+        Continue recording after a speech onset until the speaker pauses.
+        
+        Args:
+            onset (np.ndarray): int16 audio that triggered the VAD
+            
+        Returns:
+            np.ndarray: int16 audio of the whole utterance
+        """
+        frame_seconds = VAD_FRAME_SAMPLES / SAMPLE_RATE
+        frames = [onset]
+        duration = len(onset) / SAMPLE_RATE
+        silence = 0.0
+        
+        while duration < WAKE_WORD_MAX_SECONDS and silence < self.phrase_timeout:
+            frame = self._read_frame(self._stream)
+            frames.append(frame)
+            duration += frame_seconds
+            silence = 0.0 if self._is_speech(frame) else silence + frame_seconds
+        
+        return np.concatenate(frames)
+
+    def _spot_wake_word(self) -> bool:
+        """
+        Read one 80 ms frame and score it with openWakeWord, skipping frames
+        in which the WebRTC VAD finds no speech.
+        
+        Returns:
+            bool: True if the wake word score exceeds the threshold
+        """
+        data, _ = self._stream.read(OWW_FRAME_SAMPLES)
+        pcm = bytes(data)
+        sub_frame_bytes = OWW_VAD_SAMPLES * 2
+        voiced = any(
+            self._webrtc_vad.is_speech(pcm[i:i + sub_frame_bytes], SAMPLE_RATE)
+            for i in range(0, len(pcm), sub_frame_bytes)
+        )
+        frame = np.frombuffer(pcm, dtype=np.int16)
+        if not voiced:
+            self._observe_ambient(frame)
+            return False
+        
+        scores = self.wake_word_model.predict(frame)
+        detected = max(scores.values(), default=0.0) > self.wake_word_threshold
+        if detected:
+            logger.info("Wake word detected by openWakeWord")
+            self.wake_word_model.reset()
+        return detected
+
+    def detect_wake_word(self) -> bool:
+        """
+        Check for wake word in audio stream.
+        With Porcupine configured, one 32 ms frame is checked on-device (the
+        keyword comes from its model file). With openWakeWord configured, one
+        80 ms frame is scored on-device if the WebRTC VAD finds speech in it.
+        Otherwise audio only reaches the recognizer once the Silero VAD detects
+        speech, and the transcription is searched for any of the configured
+        wake words.
+        
         Returns:
             bool: True if wake word detected
+            
+        Raises:
+            sd.PortAudioError: If the microphone stream fails; the caller
+                should back off and call reopen_stream()
         """
         try:
-            with sr.Microphone() as source:
-                logger.debug("Adjusting for ambient noise in wake word detection...")
-                self.recognizer.adjust_for_ambient_noise(source, duration=1)
-                logger.debug("Listening for wake word...")
-                audio = self.recognizer.listen(source, timeout=3)
-                text = self.recognizer.recognize_google(audio).lower()
-                detected = wake_word in text
+            # Idle time between activations is spent here, so refresh the noise floor now
+            self._refresh_noise_floor()
+            
+            if self.porcupine is not None:
+                detected = self.porcupine.process(self._read_frame(self._stream)) >= 0
                 if detected:
-                    logger.info(f"Wake word '{wake_word}' detected")
+                    logger.info("Wake word detected by Porcupine")
                 return detected
+            
+            if self.wake_word_model is not None:
+                return self._spot_wake_word()
+            
+            onset = self._wait_for_speech()
+            if onset is None:
+                return False
+            
+            logger.debug("Speech detected, listening for wake word...")
+            audio = self._capture_utterance(onset)
+            text = self.recognizer.recognize_google(
+                sr.AudioData(audio.tobytes(), SAMPLE_RATE, 2)
+            )
+            match = self._wake_re.search(text)
+            if match:
+                logger.info("Wake word '%s' detected", match.group(0))
+            return match is not None
+        except sd.PortAudioError:
+            # The microphone itself failed; retrying immediately would spin
+            raise
         except Exception as e:
-            logger.warning(f"Failed to detect wake word: {str(e)}")
+            logger.warning("Failed to detect wake word: %s", e)
             return False
 
     def cleanup(self):
         """Cleanup resources."""
         logger.debug("Cleaning up SpeechRecognizer resources")
-        pass  # Add cleanup if needed
+        try:
+            self._stream.close()
+            if self.porcupine is not None:
+                self.porcupine.delete()
+        except Exception as e:
+            logger.error("Error releasing audio resources: %s", e)
 
 class TextToSpeech:
     """Handles text-to-speech operations."""
     
-    def __init__(self, voice_id: Optional[str] = None, rate: int = 150, volume: float = 0.8):
+    def __init__(self, voice_model: str = "en_US-lessac-medium.onnx", rate: int = 150, volume: float = 0.8):
         """
         Initialize text-to-speech engine.
         
         Args:
-            voice_id (str, optional): Voice ID to use
-            rate (int): Speech rate
-            volume (float): Speech volume
-        """
-        self.engine = pyttsx3.init()
-        self.engine.setProperty('rate', rate)
-        self.engine.setProperty('volume', volume)
-        
-        # Set voice if specified
-        if voice_id:
-            voices = self.engine.getProperty('voices')
-            for voice in voices:
-                if voice_id in voice.id:
-                    self.engine.setProperty('voice', voice.id)
-                    logger.info(f"Set voice to {voice.id}")
-                    break
-        logger.info("Initialized TextToSpeech")
+            voice_model (str): Path to the Piper voice model (.onnx)
+            rate (int): Speech rate in words per minute
+            volume (float): Speech volume (0.0 to 1.0)
+        """
+        use_cuda = "CUDAExecutionProvider" in ort.get_available_providers()
+        self.voice = PiperVoice.load(voice_model, use_cuda=use_cuda)
+        self.length_scale = TTS_BASE_RATE / rate
+        self.volume = volume
+        
+        # Audio is written straight to a persistent output stream as it is synthesized
+        self._stream = sd.RawOutputStream(samplerate=self.voice.config.sample_rate,
+                                          channels=1, dtype='int16')
+        self._stream.start()
+        
+        # Utterances are synthesized in order on a single worker thread
+        self._pending: SimpleQueue = SimpleQueue()
+        self._worker_thread = threading.Thread(target=self._synthesize_pending, name="tts", daemon=True)
+        self._worker_thread.start()
+        logger.info("Initialized TextToSpeech with voice %s (cuda=%s)", voice_model, use_cuda)
+
+    def _synthesize_pending(self):
+        """Synthesize queued utterances and play each audio chunk as it is produced."""
+        while True:
+            item = self._pending.get()
+            if item is None:
+                return
+            text, done = item
+            # Skip utterances whose caller has stopped waiting for them
+            if done is not None and not done.set_running_or_notify_cancel():
+                continue
+            spoken = True
+            try:
+                for chunk in self.voice.synthesize_stream_raw(text, length_scale=self.length_scale):
+                    if self.volume != 1.0:
+                        samples = np.frombuffer(chunk, dtype=np.int16) * self.volume
+                        chunk = samples.astype(np.int16).tobytes()
+                    self._stream.write(chunk)
+                logger.debug("Finished speaking")
+            except Exception as e:
+                logger.error("Error synthesizing speech: %s", e)
+                spoken = False
+            if done is not None:
+                done.set_result(spoken)
+
+    def _enqueue(self, text: str, done: Optional[Future] = None) -> bool:
+        """
+        Hand text to the worker thread.
+        
+        Args:
+            text (str): Text to be spoken
+            done (Future, optional): Resolved with the outcome once spoken
+            
+        Returns:
+            bool: True if the text was queued
+        """
+        if not self._worker_thread.is_alive():
+            logger.error("Error in speak(): engine has been shut down")
+            return False
+        logger.debug("Speaking: '%s'", text)
+        self._pending.put((text, done))
+        return True
 
     def speak(self, text: str) -> bool:
         """
-        Convert text to speech and play it.
+        Queue text to be spoken. Utterances play back-to-back in the order
+        they are queued.
+        
+        Args:
+            text (str): Text to be spoken
+            
+        Returns:
+            bool: True if the text was queued
+        """
+        return self._enqueue(text)
+
+    async def speak_async(self, text: str) -> bool:
+        """
+        Queue text to be spoken and wait, without blocking the event loop,
+        until it has been played.
         
         Args:
             text (str): Text to be spoken
@@ -153,20 +599,19 @@ class TextToSpeech:
         Returns:
             bool: True if successful
         """
-        try:
-            logger.debug(f"Speaking: '{text}'")
-            self.engine.say(text)
-            self.engine.runAndWait()
-            logger.debug("Finished speaking")
-            return True
-        except Exception as e:
-            logger.error(f"Error in speak(): {str(e)}")
+        done: Future = Future()
+        if not self._enqueue(text, done):
             return False
+        return await asyncio.wrap_future(done)
 
     def cleanup(self):
         """Cleanup resources."""
         try:
             logger.debug("Cleaning up TextToSpeech resources")
-            self.engine.stop()
+            # Let any final utterance (e.g. a goodbye) finish first
+            self._pending.put(None)
+            self._worker_thread.join(timeout=TTS_DRAIN_TIMEOUT)
+            self._stream.stop()
+            self._stream.close()
         except Exception as e:
-            logger.error(f"Error cleaning up TextToSpeech: {str(e)}")
\ No newline at end of file
+            logger.error("Error cleaning up TextToSpeech: %s", e)